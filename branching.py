@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: branching.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    parallel case splits for puzzles that propagation alone can't finish.
+
+    When LogicPuzzle.propagate stalls we pick the unsure category value with
+    the fewest possible partners in some other category and try every
+    partner at once, one branch per worker process. A row that no surviving
+    branch can keep possible is impossible, so the parent rejects it (and a
+    lone surviving branch hands over everything it learned). Then we
+    propagate again and repeat.
+
+    The branches never get a pickled DataFrame. The parent writes the
+    encoded table (see encoded.py) to a memory mapped file once per split;
+    each branch attaches to that file read only, works on its own copy of
+    the status, and sends back only the rows whose status it changed.
+
+    That copy is the (possible, confirmed) row state of a one puzzle
+    tensor.TensorEngine, compiled once in the parent and inherited by every
+    worker, so a branch propagates two boolean arrays and never builds a
+    table. Rules the engine can't run (filter functions) fall back to
+    decoding a private DataFrame per branch and propagating a LogicPuzzle
+
+Usage:
+    BranchExplorer(p, processes=8).solve()
+
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import common
+import encoded
+import puzzle
+import rule
+
+
+# ----------------------------- #
+#   worker side                 #
+# ----------------------------- #
+
+# set once per worker process by the pool initializer (fork inherits them,
+# so the categories and rules are never pickled per task either)
+_WORKER = {}
+
+
+def _init_worker(categories, rules, engine):
+    _WORKER['categories'] = categories
+    _WORKER['rules'] = rules
+    _WORKER['engine'] = engine
+
+
+def explore_branch(task):
+    """ assert col:val is othercol:other on top of the shared table and
+        propagate. Returns None for a contradiction, otherwise the positions
+        whose status changed and their new status codes
+
+    """
+    (path, col, val, othercol, other) = task
+    table = encoded.MappedTable(path, mode='r')
+    if _WORKER['engine'] is None:
+        status = _branch_frame(table, col, val, othercol, other)
+    else:
+        status = _branch_tensor(table, col, val, othercol, other)
+    if status is None:
+        return None
+    changed = np.flatnonzero(status != table.status)
+    return (changed, status[changed])
+
+
+def _branch_tensor(table, col, val, othercol, other):
+    """ the branch on the worker's engine, whose row state (by row label)
+        starts from the mapped status; the new status codes, or None
+
+    """
+    engine = _WORKER['engine']
+    labels = np.asarray(table.index)
+    engine.possible[0] = False
+    engine.possible[0, labels[table.status != encoded.REJECTED]] = True
+    engine.confirmed[0] = False
+    engine.confirmed[0, labels[table.status == encoded.CONFIRMED]] = True
+
+    engine.assume(0, engine.value_id(0, col, val), engine.value_id(0, othercol, other))
+    engine.propagate()
+    if engine.contradictions()[0]:
+        return None
+
+    status = np.where(engine.confirmed[0, labels], encoded.CONFIRMED, encoded.UNSURE)
+    status[~engine.possible[0, labels]] = encoded.REJECTED
+    return status.astype(np.int8)
+
+
+def _branch_frame(table, col, val, othercol, other):
+    """ the branch on a decoded copy of the table """
+    categories = _WORKER['categories']
+    p = puzzle.LogicPuzzle(
+        categories, _WORKER['rules'],
+        maxsolveattempts=None,
+        df=table.decode(categories),
+        keephistory=False,
+        compactthreshold=None
+    )
+    p.df = rule.is_same(
+        common.catval_filter(col, val), common.catval_filter(othercol, other), p.df
+    )
+    p.propagate()
+    if not p.consistent():
+        return None
+    return encoded.encode_status(p.df[common.STATUS])
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class BranchingError(Exception):
+    pass
+
+
+class BranchExplorer(object):
+    def __init__(self, puzzle, processes=None, tmpdir=None):
+        self.puzzle = puzzle
+        self.processes = processes or multiprocessing.cpu_count()
+        self.tmpdir = tmpdir
+
+    def solve(self, maxsplits=None):
+        """ alternate propagation and parallel splits until the puzzle is
+            solved, a split teaches us nothing, or we've done maxsplits of
+            them. Returns whether or not we solved it
+
+        """
+        p = self.puzzle
+        pool = multiprocessing.Pool(
+            self.processes, initializer=_init_worker,
+            initargs=(p.categories, p.rules, p.prober())
+        )
+        tmpdir = tempfile.mkdtemp(dir=self.tmpdir)
+        try:
+            nsplits = 0
+            while not p.propagate():
+                if maxsplits is not None and nsplits >= maxsplits:
+                    break
+                if not self.split(pool, tmpdir):
+                    break
+                nsplits += 1
+        finally:
+            pool.terminate()
+            pool.join()
+            shutil.rmtree(tmpdir)
+
+        if not p.consistent():
+            raise BranchingError("the rules contradict each other")
+        return p.solved()
+
+    def choose_split(self):
+        """ (col, val, othercol, partners): the unsure value col:val with the
+            fewest (but more than one) possible partners in othercol
+
+        """
+        poss = self.puzzle.poss
+        cols = common.category_columns(poss)
+        best = None
+        for col in cols:
+            for othercol in cols:
+                if othercol == col:
+                    continue
+                counts = poss[[col, othercol]].drop_duplicates()[col].value_counts()
+                counts = counts[counts > 1]
+                if counts.empty:
+                    continue
+                if best is None or counts.min() < best[0]:
+                    best = (counts.min(), col, counts.idxmin(), othercol)
+
+        if best is None:
+            return None
+        (n, col, val, othercol) = best
+        partners = sorted(set(poss[poss[col] == val][othercol]))
+        return (col, val, othercol, partners)
+
+    def split(self, pool, tmpdir):
+        """ explore one split in parallel and fold the results back into the
+            puzzle. Returns whether we learned anything
+
+        """
+        p = self.puzzle
+        choice = self.choose_split()
+        if choice is None:
+            return False
+        (col, val, othercol, partners) = choice
+
+        (index, codes, status) = encoded.encode(p.df, p.categories)
+        path = os.path.join(tmpdir, 'table.bin')
+        encoded.MappedTable.create(path, index, codes, status)
+        try:
+            results = pool.map(
+                explore_branch,
+                [(path, col, val, othercol, other) for other in partners],
+                chunksize=1
+            )
+        finally:
+            os.remove(path)
+
+        live = [r for r in results if r is not None]
+        if not live:
+            raise BranchingError(
+                "every branch of {}:{} is a contradiction".format(col, val)
+            )
+
+        # a row stays possible only if some surviving branch keeps it
+        rejected = np.ones(status.shape, dtype=bool)
+        for (changed, newstatus) in live:
+            branchstatus = status.copy()
+            branchstatus[changed] = newstatus
+            rejected &= branchstatus == encoded.REJECTED
+
+        if len(live) == 1:
+            newstatus = branchstatus
+        else:
+            newstatus = status.copy()
+            newstatus[rejected] = encoded.REJECTED
+
+        if (newstatus == status).all():
+            return False
+        df = p.df.copy()
+        df.loc[:, common.STATUS] = encoded.decode_status(newstatus)
+        p.df = df
+        return True
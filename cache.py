@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: cache.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    persistent solution cache for repeated puzzles.
+
+    Solutions are stored in an sqlite file under the digest of the puzzle's
+    canonical form (see canonical.py), so the same puzzle with its
+    categories, values, or rules shuffled (or its rules reworded into the
+    same Rule) is answered from the cache. Solutions are stored in canonical
+    form too and handed back in the asker's category order.
+
+    The cache holds at most maxentries solutions; past that the least
+    recently used ones are evicted
+
+Usage:
+    c = SolutionCache('solutions.db', maxentries=100000)
+    c.solve(p)          # LogicPuzzle.solve, unless we've seen p before
+    c.get(categories, rules), c.put(categories, rules, rows)
+    c.stats()
+
+"""
+
+import contextlib
+import json
+import sqlite3
+import threading
+
+import canonical
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+MAXENTRIES = 10000
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS solutions (
+        digest TEXT PRIMARY KEY,
+        solution TEXT NOT NULL,
+        used INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)",
+]
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class SolutionCacheError(Exception):
+    pass
+
+
+class SolutionCache(object):
+    def __init__(self, path, maxentries=MAXENTRIES):
+        self.path = path
+        self.maxentries = maxentries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # transactions are ours to manage (see _transaction)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        # in one transaction, so that other connections opening the file at
+        # the same time see a single schema change
+        with self._transaction():
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+
+    def get(self, categories, rules):
+        """ the solution (one tuple of values per entity, in category order)
+            for this puzzle, or None if we don't have it
+
+        """
+        try:
+            key = canonical.digest(categories, rules)
+        except canonical.CanonicalError:
+            self.misses += 1
+            return None
+
+        with self._lock, self._transaction():
+            row = self._conn.execute(
+                'SELECT solution FROM solutions WHERE digest = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                'UPDATE solutions SET used = ? WHERE digest = ?',
+                (self._tick(), key)
+            )
+            self.hits += 1
+        return canonical.decode_rows(categories, json.loads(row[0]))
+
+    def put(self, categories, rules, rows):
+        """ remember rows (same format get returns) as the solution. Puzzles
+            without a canonical form are silently skipped
+
+        """
+        try:
+            key = canonical.digest(categories, rules)
+        except canonical.CanonicalError:
+            return
+        solution = json.dumps(canonical.encode_rows(categories, rows))
+        with self._lock, self._transaction():
+            self._conn.execute(
+                'INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)',
+                (key, solution, self._tick())
+            )
+            self._evict()
+
+    def solve(self, p, **kwargs):
+        """ solve LogicPuzzle p from the cache if we can, otherwise with
+            p.solve(**kwargs), caching the solution if there is one. Returns
+            a PartialSolution either way
+
+        """
+        rows = self.get(p.categories, p.rules)
+        if rows is not None:
+            p.set_solution(rows)
+            return p.partial_solution()
+        partial = p.solve(**kwargs)
+        if partial.solved:
+            self.put(p.categories, p.rules, p.solution_rows())
+        return partial
+
+    def stats(self):
+        with self._lock:
+            (n,) = self._conn.execute('SELECT COUNT(*) FROM solutions').fetchone()
+        return {
+            'entries': n,
+            'maxentries': self.maxentries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def close(self):
+        self._conn.close()
+
+    # utilities
+    @contextlib.contextmanager
+    def _transaction(self):
+        """ a transaction that takes sqlite's write lock up front, so that
+            reading the counter in _tick and writing it back can't interleave
+            with another process using the same file
+
+        """
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def _tick(self):
+        """ next value of the "last used" counter (only called with the lock
+            held, in a _transaction)
+
+        """
+        (last,) = self._conn.execute('SELECT MAX(used) FROM solutions').fetchone()
+        return (last or 0) + 1
+
+    def _evict(self):
+        (n,) = self._conn.execute('SELECT COUNT(*) FROM solutions').fetchone()
+        if n <= self.maxentries:
+            return
+        cur = self._conn.execute(
+            'DELETE FROM solutions WHERE digest IN ('
+            '    SELECT digest FROM solutions ORDER BY used LIMIT ?'
+            ')',
+            (n - self.maxentries,)
+        )
+        self.evictions += cur.rowcount
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: canonical.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    order independent canonical forms of categories, rules, and puzzles.
+
+    Two puzzles get the same canonical form (and so the same digest) if
+    they only differ in the order of their categories, the order of the
+    values within a category, the order of their rules, or in rules that
+    say the same thing two ways ("a was b" / "b was a", "x had 2 more y
+    than z" / "z had 2 fewer y than x", repeated lines, ...).
+
+    Everything is built out of json-able lists so that the digest is just a
+    hash of the json
+
+Usage:
+    digest(categories, rules)
+    rule_key(r, categories)     # hashable (tuple) version of a rule
+    encode_rows(categories, rows), decode_rows(categories, rows)
+
+"""
+
+import hashlib
+import json
+import math
+
+import categories as categories_
+import common
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+# rule function name -> groups of parameters whose order doesn't matter
+SYMMETRIC = {
+    'is_same': [('filt1', 'filt2')],
+    'is_diff': [('filt1', 'filt2')],
+    'is_either_or': [('eitherfilt', 'orfilt')],
+    'is_one_of': [('eitherfilt', 'orfilt')],
+    'is_neither_nor': [('neitherfilt', 'norfilt')],
+}
+
+
+# ----------------------------- #
+#   canonical forms             #
+# ----------------------------- #
+
+class CanonicalError(Exception):
+    pass
+
+
+def value_key(v):
+    """ [type, value] for a single category value; numbers compare by value
+        (so 3 and 3.0 are the same, and nan is nan) and months by their
+        string
+
+    """
+    if hasattr(v, 'item'):
+        v = v.item()
+    if common.is_month(v):
+        return ['month', str(v)]
+    if isinstance(v, bool):
+        return ['bool', v]
+    if isinstance(v, float) and (math.isnan(v) or math.isinf(v)):
+        return ['num', str(v)]
+    if isinstance(v, (int, long, float)):
+        return ['num', int(v) if v == int(v) else v]
+    if isinstance(v, basestring):
+        return ['str', v]
+    raise CanonicalError("no canonical form for value {!r}".format(v))
+
+
+def param_key(p):
+    """ a rule parameter: a value, or a list of them (whose order never
+        matters; see similarity_group_updates)
+
+    """
+    if isinstance(p, (list, tuple, set, frozenset)):
+        return ['list', sorted(param_key(x) for x in p)]
+    if callable(p):
+        if hasattr(p, 'value'):
+            # a filter that knows its value (e.g. template.MaskFilter)
+            return value_key(p.value)
+        raise CanonicalError("filter functions have no canonical form")
+    return value_key(p)
+
+
+def rule_canon(r, categories=None):
+    """ with categories, the comparison category of is_ordered and
+        is_incremented is the category's name (so 'age' and 'ages' are the
+        same)
+
+    """
+    name = r.f.__name__
+    params = {k: param_key(v) for (k, v) in r.params.items()}
+
+    if categories is not None and 'compCat' in r.params:
+        try:
+            compcat = categories.comparison_category(r.params['compCat'])
+        except categories_.CategoriesError as e:
+            raise CanonicalError(str(e))
+        params['compCat'] = value_key(compcat)
+
+    for group in SYMMETRIC.get(name, []):
+        if all(k in params for k in group):
+            vals = sorted(params[k] for k in group)
+            params.update(zip(group, vals))
+
+    if name == 'pair_is_pair':
+        pairs = sorted([
+            sorted([params['filt11'], params['filt12']]),
+            sorted([params['filt21'], params['filt22']]),
+        ])
+        (params['filt11'], params['filt12']) = pairs[0]
+        (params['filt21'], params['filt22']) = pairs[1]
+
+    if name == 'is_incremented' and params.get('offset', ['num', 0])[1] < 0:
+        # big = small - n is just small = big + n
+        (params['bigfilt'], params['smallfilt']) = (params['smallfilt'], params['bigfilt'])
+        params['offset'] = ['num', -params['offset'][1]]
+
+    return [name, sorted([k, v] for (k, v) in params.items())]
+
+
+def rule_key(r, categories=None):
+    """ hashable canonical form of one rule (see rule_canon) """
+    return json.dumps(rule_canon(r, categories), sort_keys=True)
+
+
+def categories_canon(categories):
+    return sorted(
+        [cat.name, sorted(value_key(v) for v in cat.values)]
+        for cat in categories
+    )
+
+
+def puzzle_canon(categories, rules):
+    return {
+        'categories': categories_canon(categories),
+        'rules': sorted(set(rule_key(r, categories) for r in rules)),
+    }
+
+
+def digest(categories, rules):
+    """ hex digest of the canonical form of the puzzle """
+    canon = json.dumps(puzzle_canon(categories, rules), sort_keys=True)
+    return hashlib.sha256(canon).hexdigest()
+
+
+# ----------------------------- #
+#   solutions                   #
+# ----------------------------- #
+
+def encode_rows(categories, rows):
+    """ canonical (order independent, json-able) form of a solution given as
+        one tuple of values per entity, in category order
+
+    """
+    return sorted(
+        sorted([cat.name, value_key(v)] for (cat, v) in zip(categories, row))
+        for row in rows
+    )
+
+
+def decode_rows(categories, canonrows):
+    """ inverse of encode_rows for categories which may be in another order
+        (but have the same canonical form)
+
+    """
+    lookup = {
+        cat.name: {json.dumps(value_key(v)): v for v in cat.values}
+        for cat in categories
+    }
+    rows = []
+    for canonrow in canonrows:
+        d = {name: lookup[name][json.dumps(key)] for (name, key) in canonrow}
+        rows.append(tuple(d[cat.name] for cat in categories))
+    return sorted(rows, key=lambda row: categories.row_labels([row])[0])
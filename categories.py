@@ -15,6 +15,7 @@ Usage:
 """
 
 import itertools
+import operator
 import pandas as pd
 import yaml
 
@@ -25,6 +26,10 @@ import common
 #   category class              #
 # ----------------------------- #
 
+class CategoriesError(Exception):
+    pass
+
+
 class Categories(list):
     def __init__(self, numcats, numvals):
         raise NotImplementedError()
@@ -40,6 +45,93 @@ class Categories(list):
     def dts(self):
         return [_.dtype for _ in self]
 
+    @property
+    def nrows(self):
+        """ the number of rows in possibilities() """
+        return reduce(operator.mul, map(len, self), 1)
+
+    @property
+    def months(self):
+        """ names of the month categories """
+        return getattr(self, '_months', frozenset())
+
+    def append_months(self, name, vals):
+        """ add a month category. Its values are stored as month ordinals
+            (see common.month_ordinal), so rules compare plain ints; display
+            turns them back into months
+
+        """
+        self._months = self.months | {name}
+        self.append(
+            pd.Series(data=map(common.month_ordinal, vals), name=name, dtype='int64')
+        )
+
+    def display(self, df):
+        """ copy of df (or a Series of one category) with the month ordinals
+            of the month categories turned back into months
+
+        """
+        df = df.copy()
+        if isinstance(df, pd.Series):
+            if df.name in self.months:
+                df = df.map(common.from_ordinal)
+            return df
+        for name in self.months:
+            if name in df.columns:
+                df[name] = df[name].map(common.from_ordinal)
+        return df
+
+    def display_value(self, name, v):
+        return common.from_ordinal(v) if name in self.months else v
+
+    def locate(self, val):
+        """ the (category index, value index) of val. Like val_filter, we
+            only get the value itself, so it had better live in exactly one
+            category
+
+        """
+        found = [
+            (i, j)
+            for (i, cat) in enumerate(self)
+            for (j, v) in enumerate(cat.values)
+            if v == val
+        ]
+        if len(found) != 1:
+            msg = "value {} found in {} categories (need exactly 1)"
+            msg = msg.format(val, len(found))
+            raise CategoriesError(msg)
+        return found[0]
+
+    def comparison_category(self, compCat):
+        """ the category name matching compCat (a name or a singular version
+            of one); see common.comparison_category
+
+        """
+        if compCat in self.names:
+            return compCat
+        elif '{}s'.format(compCat) in self.names:
+            return '{}s'.format(compCat)
+        else:
+            msg = "Cannot find a category name that matches comparison category {}"
+            msg = msg.format(compCat)
+            raise CategoriesError(msg)
+
+    def row_labels(self, rows):
+        """ the labels in possibilities() of rows (tuples of values in
+            category order). possibilities() is a cartesian product, so the
+            label is just the value positions read as a mixed radix number
+
+        """
+        positions = [{v: i for (i, v) in enumerate(cat.values)} for cat in self]
+        sizes = map(len, self)
+        labels = []
+        for row in rows:
+            label = 0
+            for (v, pos, size) in zip(row, positions, sizes):
+                label = label * size + pos[v]
+            labels.append(label)
+        return labels
+
     def possibilities(self):
         df = pd.DataFrame(
             data=list(itertools.product(*self)),
@@ -68,24 +160,36 @@ class CategoriesInteractive(Categories):
             vals = [raw_input("\t> ") for i in range(self.numvals)]
             dt = common.get_datatype_interactive(indent="\t")
 
-            if dt == common.MONTHTYPE:
-                vals = map(common.monthify, vals)
+            if dt == common.MONTH:
+                self.append_months(name, vals)
+            else:
+                self.append(pd.Series(data=vals, name=name, dtype=dt))
 
-            self.append(pd.Series(data=vals, name=name, dtype=dt))
 
+class CategoriesFromDict(Categories):
+    """ cats looks like the contents of a categories yaml file:
+            {name: {'values': [...], 'type': dtype (optional)}, ...}
 
-class CategoriesFromYaml(Categories):
-    def __init__(self, f):
-        self.get_categories(f)
+    """
+    def __init__(self, cats):
+        self.get_categories(cats)
 
-    def get_categories(self, f):
-        with open(f, 'r') as fcat:
-            cats = yaml.load(fcat)
+    def get_categories(self, cats):
         for (name, d) in cats.items():
             vals = d['values']
             dt = d.get('type', 'category')
 
-            if dt == common.MONTHTYPE:
-                vals = map(common.monthify, vals)
+            if dt == common.MONTH:
+                self.append_months(name, vals)
+            else:
+                self.append(pd.Series(data=vals, name=name, dtype=dt))
+
 
-            self.append(pd.Series(data=vals, name=name, dtype=dt))
+class CategoriesFromYaml(CategoriesFromDict):
+    def __init__(self, f):
+        self.get_categories(f)
+
+    def get_categories(self, f):
+        with open(f, 'r') as fcat:
+            cats = yaml.load(fcat)
+        super(CategoriesFromYaml, self).get_categories(cats)
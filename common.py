@@ -16,7 +16,6 @@ Usage:
 
 import datetime
 import functools
-import pandas as pd
 
 
 # ----------------------------- #
@@ -26,8 +25,15 @@ import pandas as pd
 STATUS = 'status'
 CONFIRMED, REJECTED, UNSURE = 'confirmed', 'rejected', 'unsure'
 
-NOW = datetime.datetime.now()
-MONTHTYPE = pd._period.Period
+# integer codes for the statuses (position in this list) wherever we keep
+# the status column as a plain array (see encoded.py)
+STATUSES = [UNSURE, CONFIRMED, REJECTED]
+
+# where a solve step came from when it isn't a rule (whose source is its
+# position in the rule list); provenance.py logs them as rule ids
+CLEAN_UP = -2
+EXTERNAL = -3   # set directly through LogicPuzzle.df (or there from the start)
+PROBE = -4      # failed literal probing, see LogicPuzzle.probe
 
 
 # ----------------------------- #
@@ -49,7 +55,7 @@ def get_datatype_interactive(indent):
     elif dt in ('f', 'float'):
         return float
     elif dt in ('m', 'month'):
-        return MONTHTYPE
+        return MONTH
     else:
         return 'category'
 
@@ -72,44 +78,69 @@ NOV = (11, '11', 'n', 'no', 'nov', 'november')
 DEC = (12, '12', 'd', 'de', 'dec', 'december')
 
 
+# alias -> month number, flattened from the tuples above
+MONTH_NUMBERS = {
+    alias: aliases[0]
+    for aliases in (JAN, FEB, MAR, APR, MAY, JUN, JUL, AUG, SEP, OCT, NOV, DEC)
+    for alias in aliases
+}
+
+# category type of month categories, whose values are kept as month ordinals
+# (see month_ordinal) and only turned into Periods for output
+MONTH = 'month'
+MONTHS_PER_YEAR = 12
+
+
 class MonthifyError(Exception):
     pass
 
 
-def to_month(x):
-    return pd.tseries.period.Period('{}-{:0>2}'.format(NOW.year, x))
-
-
-MONTHS = {
-    JAN: to_month(1),
-    FEB: to_month(2),
-    MAR: to_month(3),
-    APR: to_month(4),
-    MAY: to_month(5),
-    JUN: to_month(6),
-    JUL: to_month(7),
-    AUG: to_month(8),
-    SEP: to_month(9),
-    OCT: to_month(10),
-    NOV: to_month(11),
-    DEC: to_month(12),
-}
+def month_type():
+    """ the type of month values (pandas Period) """
+    import pandas as pd
+    return pd._period.Period
 
 
-def monthify(x):
-    try:
-        try:
-            x = x.lower()
-        except:
-            pass
+def is_month(x):
+    """ isinstance(x, month_type()), without importing pandas if nothing
+        could be a month yet
+
+    """
+    import sys
+    return 'pandas' in sys.modules and isinstance(x, month_type())
 
-        for (k, m) in MONTHS.items():
-            if x in k:
-                return m
 
-        raise MonthifyError()
-    except:
+def month_ordinal(x, year=None):
+    """ month alias x as the number of months since 1970-01 (the ordinal of
+        a monthly pandas Period), in year (default this year). Ordinals are
+        plain ints, so month categories compare and offset like any other
+        int category
+
+    """
+    try:
+        x = x.lower()
+    except AttributeError:
+        pass
+    try:
+        num = MONTH_NUMBERS[x]
+    except (KeyError, TypeError):
         raise MonthifyError('could not convert month value "{}" to int'.format(x))
+    year = year or datetime.date.today().year
+    return (year - 1970) * MONTHS_PER_YEAR + num - 1
+
+
+def from_ordinal(ordinal):
+    """ the month (pandas Period) of a month ordinal """
+    import pandas as pd
+    return pd.Period(ordinal=int(ordinal), freq='M')
+
+
+def to_month(x):
+    return from_ordinal(month_ordinal(x))
+
+
+def monthify(x):
+    return to_month(x)
 
 
 # ----------------------------- #
@@ -117,7 +148,7 @@ def monthify(x):
 # ----------------------------- #
 
 def force_filter(f):
-    return val_filter(f) if isinstance(f, (basestring, int, MONTHTYPE)) else f
+    return val_filter(f) if isinstance(f, (basestring, int)) or is_month(f) else f
 
 
 def catval_filter(cat, val, onlyPoss=True):
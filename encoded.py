@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: encoded.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    integer encoded version of the possibility table. Each category column
+    becomes the position of its value in the category (so the codes of row i
+    of Categories.possibilities() are just i read as a mixed radix number)
+    and the status column becomes its position in common.STATUSES.
+
+    Plain arrays like these can be written to a memory mapped file once and
+    then read by any number of processes without pickling a DataFrame
+
+Usage:
+    (index, codes, status) = encode(df, categories)
+    df = decode(index, codes, status, categories)
+
+    MappedTable.create(path, index, codes, status)
+    t = MappedTable(path)   # t.index, t.codes, t.status are np.memmap-s
+
+    MappedTable.create(path, index, codes, status, meta=blob, iteration=3)
+    t = MappedTable(path)   # t.meta == blob, t.header['iteration'] == 3
+
+"""
+
+import collections
+import numpy as np
+import pandas as pd
+
+import common
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+UNSURE = common.STATUSES.index(common.UNSURE)
+CONFIRMED = common.STATUSES.index(common.CONFIRMED)
+REJECTED = common.STATUSES.index(common.REJECTED)
+
+
+# ----------------------------- #
+#   encoding                    #
+# ----------------------------- #
+
+class EncodingError(Exception):
+    pass
+
+
+def code_dtype(categories):
+    """ the smallest int type that can hold a value position """
+    n = max(len(cat) for cat in categories)
+    for dt in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dt).max:
+            return dt
+    return np.int64
+
+
+def encode(df, categories):
+    """ (index, codes, status) arrays for a possibility table """
+    index = np.asarray(df.index, dtype=np.int64)
+    codes = np.empty((df.shape[0], len(categories)), dtype=code_dtype(categories))
+    for (i, cat) in enumerate(categories):
+        codes[:, i] = pd.Index(list(cat.values)).get_indexer(np.asarray(df[cat.name]))
+    if (codes < 0).any():
+        raise EncodingError("table holds values that aren't in the categories")
+    return (index, codes, encode_status(df[common.STATUS]))
+
+
+def encode_status(status):
+    return pd.Index(common.STATUSES).get_indexer(np.asarray(status)).astype(np.int8)
+
+
+def decode_status(status):
+    return np.asarray(common.STATUSES, dtype=object)[status]
+
+
+def row_state(df, categories):
+    """ (possible, confirmed) boolean arrays by row label, for every row of
+        categories.possibilities() (rows missing from df are rejected)
+
+    """
+    labels = np.asarray(df.index)
+    status = df[common.STATUS].values
+    possible = np.zeros(categories.nrows, dtype=bool)
+    possible[labels[status != common.REJECTED]] = True
+    confirmed = np.zeros(categories.nrows, dtype=bool)
+    confirmed[labels[status == common.CONFIRMED]] = True
+    return (possible, confirmed)
+
+
+def decode(index, codes, status, categories):
+    """ inverse of encode; dtypes match Categories.possibilities() """
+    data = collections.OrderedDict()
+    for (i, cat) in enumerate(categories):
+        data[cat.name] = decode_column(codes[:, i], cat)
+    data[common.STATUS] = decode_status(status)
+    return pd.DataFrame(
+        data,
+        index=pd.Index(np.array(index, dtype=np.int64)),
+        columns=categories.names + [common.STATUS]
+    )
+
+
+def decode_column(codes, cat):
+    vals = list(cat.values)
+    if getattr(cat.dtype, 'name', None) == 'category':
+        # same (sorted) category order astype('category') would give us
+        cats = sorted(vals)
+        rank = {v: i for (i, v) in enumerate(cats)}
+        remap = np.array([rank[v] for v in vals])
+        return pd.Categorical.from_codes(remap[codes], categories=cats)
+    return np.asarray(vals, dtype=cat.dtype)[codes]
+
+
+# ----------------------------- #
+#   memory mapped tables        #
+# ----------------------------- #
+
+class MappedTable(object):
+    """ index, codes and status in one memory mapped file:
+            header  - int64[len(HEADER)]
+            index   - int64[nrows]
+            codes   - int(codesize bytes)[nrows, ncats]
+            status  - int8[nrows]
+            meta    - metasize bytes, opaque to us
+
+        mode is passed on to np.memmap; 'r' to share read only, 'c' for a
+        private copy-on-write view, 'r+' to update the file in place.
+
+        iteration and rulepos are spare header fields for whoever wrote the
+        table (LogicPuzzle.checkpoint keeps its place in the solve there)
+
+    """
+    MAGIC = 0x4c505331
+    VERSION = 2
+    HEADER = [
+        'magic', 'version', 'nrows', 'ncats', 'codesize', 'metasize',
+        'iteration', 'rulepos'
+    ]
+
+    def __init__(self, path, mode='r'):
+        self.path = path
+        header = np.memmap(path, dtype=np.int64, mode='r', shape=(len(self.HEADER),))
+        self.header = dict(zip(self.HEADER, header.tolist()))
+        del header
+        if self.header['magic'] != self.MAGIC:
+            raise EncodingError("{} is not a mapped table".format(path))
+        if self.header['version'] != self.VERSION:
+            raise EncodingError("unknown mapped table version {}".format(self.header['version']))
+
+        (nrows, ncats) = (self.header['nrows'], self.header['ncats'])
+        codedtype = np.dtype('int{}'.format(8 * self.header['codesize']))
+        (o_index, o_codes, o_status, o_meta, end) = self.offsets(
+            nrows, ncats, codedtype.itemsize, self.header['metasize']
+        )
+        self.index = np.memmap(path, dtype=np.int64, mode=mode, offset=o_index, shape=(nrows,))
+        self.codes = np.memmap(path, dtype=codedtype, mode=mode, offset=o_codes, shape=(nrows, ncats))
+        self.status = np.memmap(path, dtype=np.int8, mode=mode, offset=o_status, shape=(nrows,))
+        self._o_meta = o_meta
+
+    @classmethod
+    def offsets(cls, nrows, ncats, codesize, metasize=0):
+        o_index = 8 * len(cls.HEADER)
+        o_codes = o_index + 8 * nrows
+        o_status = o_codes + codesize * nrows * ncats
+        o_meta = o_status + nrows
+        return (o_index, o_codes, o_status, o_meta, o_meta + metasize)
+
+    @classmethod
+    def create(cls, path, index, codes, status, meta='', iteration=0,
+               rulepos=0):
+        (nrows, ncats) = codes.shape
+        (o_meta, end) = cls.offsets(nrows, ncats, codes.dtype.itemsize, len(meta))[-2:]
+        with open(path, 'wb') as f:
+            f.truncate(end)
+            f.seek(o_meta)
+            f.write(meta)
+        header = np.memmap(path, dtype=np.int64, mode='r+', shape=(len(cls.HEADER),))
+        header[:] = [
+            cls.MAGIC, cls.VERSION, nrows, ncats, codes.dtype.itemsize,
+            len(meta), iteration, rulepos
+        ]
+        header.flush()
+        del header
+
+        table = cls(path, mode='r+')
+        table.index[:] = index
+        table.codes[:] = codes
+        table.status[:] = status
+        table.flush()
+        return table
+
+    @property
+    def meta(self):
+        """ the opaque bytes stored after the arrays (read, not mapped) """
+        with open(self.path, 'rb') as f:
+            f.seek(self._o_meta)
+            return f.read(self.header['metasize'])
+
+    def flush(self):
+        for arr in (self.index, self.codes, self.status):
+            arr.flush()
+
+    def decode(self, categories):
+        return decode(self.index, self.codes, self.status, categories)
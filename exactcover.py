@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: exactcover.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    count (or list) the solutions of a puzzle without ever building the full
+    table of possibilities.
+
+    The first category supplies the entities. Every other category has to
+    hand out each of its values to exactly one entity, which is an exact
+    cover problem:
+        rows    - (category, entity, value) assignments
+        columns - "entity has a value in category" and "value has an entity"
+    and we search it with Knuth's Algorithm X, using the dict-of-sets flavour
+    of dancing links (cover / uncover are O(size of the row) and exactly
+    reversible). Rules are checked against the partial assignment every time
+    a row is chosen, so bad branches are cut as soon as they are made
+
+Usage:
+    count_solutions(categories, rules)           # all of them
+    count_solutions(categories, rules, limit=2)  # enough to spot ambiguity
+    is_unique(categories, rules)
+
+"""
+
+import collections
+
+import categories as categories_
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class ExactCoverError(Exception):
+    pass
+
+
+class ExactCover(object):
+    def __init__(self, categories, rules, heuristic='mrv'):
+        """ heuristic is how we pick the column to branch on: 'mrv' (the one
+            with the fewest rows left) or 'first' (fixed column order)
+
+        """
+        if heuristic not in ('mrv', 'first'):
+            raise ExactCoverError("unknown heuristic {}".format(heuristic))
+        self.categories = categories
+        self.heuristic = heuristic
+        self._values = [list(cat.values) for cat in categories]
+        self.n = len(self._values[0])
+        if any(len(vals) != self.n for vals in self._values):
+            raise ExactCoverError("all categories must have the same size")
+
+        # partial assignment. _ent[c][j] is the entity holding value j of
+        # category c, and _val[c][e] is the value index entity e has in
+        # category c. The first category *is* the entity list
+        k = len(self._values)
+        self._ent = [range(self.n)] + [[None] * self.n for _ in range(k - 1)]
+        self._val = [range(self.n)] + [[None] * self.n for _ in range(k - 1)]
+
+        # rule checks, keyed by every category they care about
+        self._checks = []
+        self._watch = collections.defaultdict(list)
+        for r in rules:
+            self._compile(r)
+
+        # the exact cover matrix itself
+        self._Y = {}
+        for c in range(1, k):
+            for e in range(self.n):
+                for j in range(self.n):
+                    self._Y[(c, e, j)] = [('e', c, e), ('v', c, j)]
+        self._X = collections.defaultdict(set)
+        for (row, cols) in self._Y.items():
+            for col in cols:
+                self._X[col].add(row)
+        self._X = dict(self._X)
+
+    def solutions(self, limit=None):
+        """ yield solutions (one tuple of values per entity, in category
+            order) until we run out or have found limit of them
+
+        """
+        if not all(check() for check in self._checks):
+            return
+        # closing the search unwinds every cover / assign it still has open,
+        # so stopping early leaves the matrix ready for the next call
+        search = self._search()
+        try:
+            for (i, soln) in enumerate(search):
+                yield soln
+                if limit and i + 1 >= limit:
+                    return
+        finally:
+            search.close()
+
+    def count(self, limit=None):
+        return sum(1 for _ in self.solutions(limit=limit))
+
+    # search
+    def _search(self):
+        if not self._X:
+            yield [
+                tuple(vals[self._val[c][e]] for (c, vals) in enumerate(self._values))
+                for e in range(self.n)
+            ]
+            return
+
+        if self.heuristic == 'mrv':
+            col = min(self._X, key=lambda c: len(self._X[c]))
+        else:
+            col = min(self._X)
+        for row in list(self._X[col]):
+            # checking before covering saves a cover / uncover for every row
+            # a rule rejects outright
+            try:
+                if self._assign(row):
+                    covered = self._cover(row)
+                    search = self._search()
+                    try:
+                        for soln in search:
+                            yield soln
+                    finally:
+                        search.close()
+                        self._uncover(row, covered)
+            finally:
+                self._unassign(row)
+
+    def _cover(self, row):
+        covered = []
+        for col in self._Y[row]:
+            for other in self._X[col]:
+                for othercol in self._Y[other]:
+                    if othercol != col:
+                        self._X[othercol].remove(other)
+            covered.append(self._X.pop(col))
+        return covered
+
+    def _uncover(self, row, covered):
+        for col in reversed(self._Y[row]):
+            self._X[col] = covered.pop()
+            for other in self._X[col]:
+                for othercol in self._Y[other]:
+                    if othercol != col:
+                        self._X[othercol].add(other)
+
+    def _assign(self, row):
+        """ record the assignment and check every rule that could care """
+        (c, e, j) = row
+        self._ent[c][j] = e
+        self._val[c][e] = j
+        return all(check() for check in self._watch[c])
+
+    def _unassign(self, row):
+        (c, e, j) = row
+        self._ent[c][j] = None
+        self._val[c][e] = None
+
+    # partial assignment accessors
+    def _entity(self, loc):
+        (c, j) = loc
+        return self._ent[c][j]
+
+    def _can_be(self, e, loc):
+        """ could entity e still end up with value loc? """
+        (c, j) = loc
+        if self._ent[c][j] is not None:
+            return self._ent[c][j] == e
+        return self._val[c][e] is None
+
+    def _compval(self, m, loc):
+        """ the comparison category (index m) value that goes with loc, if
+            we know it yet
+
+        """
+        (c, j) = loc
+        if c == m:
+            return self._values[m][j]
+        e = self._ent[c][j]
+        if e is None or self._val[m][e] is None:
+            return None
+        return self._values[m][self._val[m][e]]
+
+    # rule compilation; each check returns False only if the rule is
+    # definitely broken by the current partial assignment
+    def _compile(self, r):
+        try:
+            compiler = getattr(self, '_compile_{}'.format(r.f.__name__))
+        except AttributeError:
+            msg = "can't model rule function {} as an exact cover constraint"
+            raise ExactCoverError(msg.format(r.f.__name__))
+        compiler(**r.params)
+
+    def _add_check(self, check, locs, extra=()):
+        self._checks.append(check)
+        for c in set([loc[0] for loc in locs] + list(extra)):
+            self._watch[c].append(check)
+
+    def _loc(self, filt):
+        if callable(filt):
+            raise ExactCoverError("filters must be plain values, not functions")
+        try:
+            return self.categories.locate(filt)
+        except categories_.CategoriesError as e:
+            raise ExactCoverError(str(e))
+
+    def _compile_is_same(self, filt1, filt2):
+        (a, b) = (self._loc(filt1), self._loc(filt2))
+
+        def check():
+            ea = self._entity(a)
+            if ea is not None:
+                return self._can_be(ea, b)
+            eb = self._entity(b)
+            return eb is None or self._can_be(eb, a)
+
+        self._add_check(check, [a, b])
+
+    def _compile_is_diff(self, filt1, filt2):
+        self._add_diff(self._loc(filt1), self._loc(filt2))
+
+    def _add_diff(self, a, b):
+        def check():
+            ea = self._entity(a)
+            return ea is None or ea != self._entity(b)
+
+        self._add_check(check, [a, b])
+
+    def _compile_is_either_or(self, isfilt, eitherfilt, orfilt):
+        self._add_either_or(
+            self._loc(isfilt), self._loc(eitherfilt), self._loc(orfilt)
+        )
+
+    def _add_either_or(self, x, y, z):
+        self._add_diff(y, z)
+
+        def check():
+            ex = self._entity(x)
+            if ex is not None:
+                return self._can_be(ex, y) or self._can_be(ex, z)
+            (ey, ez) = (self._entity(y), self._entity(z))
+            if ey is None or ez is None:
+                return True
+            return self._can_be(ey, x) or self._can_be(ez, x)
+
+        self._add_check(check, [x, y, z])
+
+    def _compile_is_neither_nor(self, isfilt, neitherfilt, norfilt):
+        (x, y, z) = (
+            self._loc(isfilt), self._loc(neitherfilt), self._loc(norfilt)
+        )
+        self._add_diff(y, z)
+        self._add_diff(x, y)
+        self._add_diff(x, z)
+
+    def _compile_pair_is_pair(self, filt11, filt12, filt21, filt22):
+        (a, b, c, d) = map(self._loc, [filt11, filt12, filt21, filt22])
+        self._add_either_or(a, c, d)
+        self._add_either_or(b, c, d)
+        self._add_either_or(c, a, b)
+        self._add_either_or(d, a, b)
+
+    def _compile_is_ordered(self, compCat, bigfilt, smallfilt, offset=0):
+        self._add_comparison(
+            compCat, bigfilt, smallfilt, lambda big, small: big > small + offset
+        )
+
+    def _compile_is_incremented(self, compCat, bigfilt, smallfilt, offset=0):
+        self._add_comparison(
+            compCat, bigfilt, smallfilt, lambda big, small: big == small + offset
+        )
+
+    def _add_comparison(self, compCat, bigfilt, smallfilt, cmp):
+        try:
+            m = self.categories.names.index(
+                self.categories.comparison_category(compCat)
+            )
+        except categories_.CategoriesError as e:
+            raise ExactCoverError(str(e))
+        (big, small) = (self._loc(bigfilt), self._loc(smallfilt))
+        self._add_diff(big, small)
+
+        def check():
+            vbig = self._compval(m, big)
+            vsmall = self._compval(m, small)
+            return vbig is None or vsmall is None or cmp(vbig, vsmall)
+
+        self._add_check(check, [big, small], extra=[m])
+
+    def _compile_similarity_group_updates(self, filtlist):
+        locs = map(self._loc, filtlist)
+        for (i, a) in enumerate(locs):
+            for b in locs[i + 1:]:
+                self._add_diff(a, b)
+
+
+# ----------------------------- #
+#   convenience functions       #
+# ----------------------------- #
+
+def count_solutions(categories, rules, limit=None):
+    return ExactCover(categories, rules).count(limit=limit)
+
+
+def is_unique(categories, rules):
+    return count_solutions(categories, rules, limit=2) == 1
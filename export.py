@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: export.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    columnar export of a puzzle's solver state for offline analysis, as
+    Arrow IPC files (which can be read memory mapped, without copying) or
+    Parquet, instead of pickling LogicPuzzle.df and the history list.
+
+    A run is written as two tables
+        state   - one row per row of the current table: its label, one
+                  dictionary encoded column per category (the codes of
+                  encoded.py into the category's values), the status
+                  (dictionary encoded too), and with provenance, the rule
+                  and iteration that rejected it
+        deltas  - one row per status change, by solve iteration, out of
+                  the provenance log (see provenance.py; so the puzzle needs
+                  keepprovenance=True, but not history): iteration, label,
+                  status, and the rule that rejected the row
+    and the solver stats go in the schema metadata of both, as json.
+
+    pyarrow is optional; without it, everything here but deltas raises
+    ExportError
+
+Usage:
+    export.write(p, 'run/')                 # run/state.arrow, run/deltas.arrow
+    (state, deltas) = export.read('run/')   # pyarrow Tables, memory mapped
+    export.stats(state)
+    export.write(p, 'run/', fmt='parquet')
+    (iterations, labels, statuses, rules) = export.deltas(p)   # numpy only
+
+"""
+
+import json
+import os
+
+import numpy as np
+
+import common
+import encoded
+import provenance
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+FORMATS = {'arrow': 'arrow', 'parquet': 'parquet'}
+TABLES = ['state', 'deltas']
+STATS = 'stats'
+
+
+# ----------------------------- #
+#   tables                      #
+# ----------------------------- #
+
+class ExportError(Exception):
+    pass
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ExportError("exporting needs pyarrow (pip install pyarrow)")
+
+
+def puzzle_stats(p):
+    """ json-able summary of where p's solve is at """
+    stats = {
+        'categories': p.categories.names,
+        'nrows': p.categories.nrows,
+        'rows': p.df.shape[0],
+        'possible': int(common.is_possible(p.df).sum()),
+        'nrules': len(p.rules),
+        'solve_attempts': p._solve_attempts,
+        'rulepos': p._rulepos,
+        'progress': p.progress(),
+        'solved': bool(p.solved()),
+        'history': len(p.history),
+    }
+    if p.provenance is not None:
+        stats['rejections'] = {str(k): v for (k, v) in p.provenance.counts().items()}
+    return stats
+
+
+def dictionary_column(codes, values):
+    return pa.DictionaryArray.from_arrays(
+        pa.array(np.ascontiguousarray(codes)), pa.array(values)
+    )
+
+
+def category_values(categories, cat):
+    """ the values of cat as arrow can hold them (months as 'yyyy-mm') """
+    return [
+        str(categories.display_value(cat.name, v)) if cat.name in categories.months
+        else v.item() if hasattr(v, 'item') else v
+        for v in cat.values
+    ]
+
+
+def state_table(p, stats=None):
+    (index, codes, status) = encoded.encode(p.df, p.categories)
+    names = ['label']
+    columns = [pa.array(index)]
+    for (i, cat) in enumerate(p.categories):
+        names.append(cat.name)
+        columns.append(dictionary_column(codes[:, i], category_values(p.categories, cat)))
+    names.append(common.STATUS)
+    columns.append(dictionary_column(status, common.STATUSES))
+    if p.provenance is not None:
+        names += ['rule', 'iteration']
+        columns += [
+            pa.array(p.provenance.rule[index]),
+            pa.array(p.provenance.iteration[index]),
+        ]
+    return _with_stats(pa.Table.from_arrays(columns, names=names), stats)
+
+
+def deltas(p):
+    """ (iterations, labels, statuses, rules): the status changes of
+        LogicPuzzle p from the all unsure table to the current one, as
+        arrays ordered by iteration and label. statuses are indices into
+        common.STATUSES and rules the provenance ids of the rejecting rules
+        (provenance.NOT_REJECTED for confirmations)
+
+    """
+    if p.provenance is None:
+        raise ExportError("deltas come from the provenance log; use keepprovenance=True")
+    log = p.provenance
+    rejected = np.flatnonzero(log.rule != provenance.NOT_REJECTED)
+    confirmed = np.flatnonzero(
+        (log.confirmed != provenance.NOT_CONFIRMED) & (log.rule == provenance.NOT_REJECTED)
+    )
+    iterations = np.concatenate([log.iteration[rejected], log.confirmed[confirmed]])
+    labels = np.concatenate([rejected, confirmed]).astype(np.int64)
+    statuses = np.concatenate([
+        np.full(rejected.size, common.STATUSES.index(common.REJECTED), dtype=np.int8),
+        np.full(confirmed.size, common.STATUSES.index(common.CONFIRMED), dtype=np.int8),
+    ])
+    order = np.lexsort((labels, iterations))
+    return (
+        iterations[order], labels[order], statuses[order], log.rule[labels[order]]
+    )
+
+
+def delta_table(p, stats=None):
+    (iterations, labels, statuses, rules) = deltas(p)
+    table = pa.Table.from_arrays(
+        [
+            pa.array(iterations),
+            pa.array(labels),
+            dictionary_column(statuses, common.STATUSES),
+            pa.array(rules),
+        ],
+        names=['iteration', 'label', common.STATUS, 'rule']
+    )
+    return _with_stats(table, stats)
+
+
+def _with_stats(table, stats):
+    if stats is None:
+        return table
+    return table.replace_schema_metadata({STATS: json.dumps(stats)})
+
+
+def stats(table):
+    """ the solver stats written with table """
+    metadata = table.schema.metadata or {}
+    return json.loads(metadata[STATS])
+
+
+# ----------------------------- #
+#   files                       #
+# ----------------------------- #
+
+def paths(path, fmt='arrow'):
+    if fmt not in FORMATS:
+        raise ExportError("format must be one of {}".format(sorted(FORMATS)))
+    return [os.path.join(path, '{}.{}'.format(t, FORMATS[fmt])) for t in TABLES]
+
+
+def write(p, path, fmt='arrow'):
+    """ write the state and deltas tables of LogicPuzzle p into directory
+        path; returns the file names
+
+    """
+    _require_pyarrow()
+    if p.provenance is None:
+        raise ExportError("exporting needs keepprovenance=True (for the deltas)")
+    fnames = paths(path, fmt)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    s = puzzle_stats(p)
+    for (fname, table) in zip(fnames, [state_table(p, s), delta_table(p, s)]):
+        if fmt == 'arrow':
+            sink = pa.OSFile(fname, 'wb')
+            try:
+                writer = pa.RecordBatchFileWriter(sink, table.schema)
+                writer.write_table(table)
+                writer.close()
+            finally:
+                sink.close()
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(table, fname)
+    return fnames
+
+
+def read(path, fmt='arrow'):
+    """ (state, deltas) tables written by write. Arrow files are memory
+        mapped, so the tables are views of the files rather than copies
+
+    """
+    _require_pyarrow()
+    tables = []
+    for fname in paths(path, fmt):
+        if fmt == 'arrow':
+            tables.append(pa.RecordBatchFileReader(pa.memory_map(fname, 'r')).read_all())
+        else:
+            import pyarrow.parquet as pq
+            tables.append(pq.read_table(fname, memory_map=True))
+    return tuple(tables)
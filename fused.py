@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: fused.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    a whole sweep of LogicPuzzle.apply_rules as a few numpy passes instead
+    of one DataFrame pass (and .loc status write) per rule.
+
+    The rules are lowered into the mask operations of tensor.py: every rule
+    instance becomes a row of index arrays into one shared table of value
+    masks (so a value used by ten rules is one mask, not ten force_filter
+    scans), and every rule type is one vectorized kernel over all of its
+    instances. On top of that
+        - the rejections of is_same, is_diff, (n)either / (n)or and
+          similarity groups don't depend on what's still possible, so they
+          are folded into a single mask once, at compile time
+        - is_ordered and is_incremented do depend on it, so they run as one
+          kernel call each per sweep
+    and a sweep ends with a single write of the status column.
+
+    Rules tensor.py has no kernel for (e.g. hand written filter functions)
+    aren't fused; LogicPuzzle runs those one at a time as usual.
+
+    A fused sweep sees the table as it was before the sweep for each rule
+    type, rather than after every single rule, so it may reject less per
+    sweep; rules only ever reject rows, though, so propagate still ends up at
+    the same place
+
+Usage:
+    p = LogicPuzzle(categories, rules, fused=True)
+    p.solve()
+
+    sweep = FusedSweep(categories, rules)
+    (df, owners) = sweep(df)
+
+"""
+
+import numpy as np
+
+import common
+import provenance
+import tensor
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+# kernels whose rejections don't depend on which rows are still possible
+STATIC = ['same', 'diff', 'either', 'neither', 'oneof']
+DYNAMIC = ['ordered', 'incremented']
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class FusedError(Exception):
+    pass
+
+
+class FusedSweep(object):
+    def __init__(self, categories, rules):
+        """ fuse the rules tensor.py supports; positions are their indices in
+            rules, and the rest are left to the caller
+
+        """
+        self.positions = [i for (i, r) in enumerate(rules) if tensor.supported(r)]
+        try:
+            self.engine = tensor.TensorEngine(
+                [(categories, [rules[i] for i in self.positions])]
+            )
+        except Exception as e:
+            raise FusedError("couldn't fuse rules: {}".format(e))
+
+        # every static rejection at once, and the (first) rule it's down to
+        (rows, owners) = self.run(STATIC)
+        self.static = rows.any(axis=0)
+        self.static_owner = self.first_owner(rows, owners)
+
+    def __call__(self, df):
+        """ (df after one sweep, owners): owners holds, by row label, the
+            position in rules of the rule that rejected each row this sweep
+            (provenance.NOT_REJECTED for the others)
+
+        """
+        labels = np.asarray(df.index)
+        status = df[common.STATUS].values
+        before = np.zeros(self.engine.R, dtype=bool)
+        before[labels[status != common.REJECTED]] = True
+
+        possible = before & ~self.static
+        owner = np.where(before & self.static, self.static_owner, provenance.NOT_REJECTED)
+        for kind in DYNAMIC:
+            self.engine.possible[0] = possible
+            (rows, owners) = self.run([kind])
+            rows &= possible
+            rejected = rows.any(axis=0)
+            owner[rejected] = self.first_owner(rows, owners)[rejected]
+            possible &= ~rejected
+
+        newly = (before & ~possible)[labels]
+        if not newly.any():
+            return (df, owner)
+        df2 = df.copy()
+        status = status.copy()
+        status[newly] = common.REJECTED
+        df2[common.STATUS] = status
+        return (df2, owner)
+
+    def run(self, kinds):
+        """ (rows, owners): the rows each instance of the kinds of kernel
+            would reject, and the position in rules of its rule
+
+        """
+        (rows, owners) = ([np.zeros((0, self.engine.R), dtype=bool)], [[]])
+        for kind in kinds:
+            ops = self.engine._ops[kind]
+            if ops.shape[1]:
+                rows.append(getattr(self.engine, '_' + kind)(*ops))
+                owners.append(np.asarray(self.positions)[self.engine._rulepos[kind]])
+        return (np.vstack(rows), np.concatenate(owners).astype(np.int64))
+
+    def first_owner(self, rows, owners):
+        """ by row, the lowest owner of the instances rejecting it """
+        owner = np.full(self.engine.R, provenance.NOT_REJECTED, dtype=np.int64)
+        if not rows.shape[0]:
+            return owner
+        order = np.argsort(owners, kind='mergesort')
+        first = rows[order].argmax(axis=0)
+        hit = rows.any(axis=0)
+        owner[hit] = owners[order][first[hit]]
+        return owner
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: generator.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    random puzzle generator. Given a Categories object we pick a hidden
+    solution, throw true clues at it until our own solver can get back to
+    that solution, and then drop every clue that turns out to be redundant.
+
+    Every clue is produced both as a Rule and as a line of text, and the text
+    is only kept if STANDARD_RULES parses it back into exactly that Rule.
+
+    The solving in between runs on the numpy row state of tensor.py rather
+    than on LogicPuzzle tables, in one TensorEngine per puzzle. Each round of
+    new clues is compiled into it (TensorEngine.extend) and propagated from
+    where the last round left off, and every minimization trial is a subset
+    of the same compiled clues (TensorEngine.subsets) started from the state
+    of the clues already kept
+
+Usage:
+    g = PuzzleGenerator(categories, seed=1337)
+    p = g.generate()
+    p.lines     # feed these to RulesFromText
+    p.solution  # same format as LogicPuzzle.solution
+
+"""
+
+import collections
+import copy
+import random
+
+import numpy as np
+
+import common
+import rule
+import rulelist
+import tensor
+
+from regexrules import STANDARD_RULES
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+# relative frequency of each clue type; "is" clues give away a lot, so we
+# prefer the more roundabout ones
+CLUE_WEIGHTS = {
+    'same': 1,
+    'diff': 3,
+    'either': 3,
+    'increment': 2,
+}
+
+GeneratedPuzzle = collections.namedtuple(
+    'GeneratedPuzzle', ['solution', 'rules', 'lines']
+)
+Clue = collections.namedtuple('Clue', ['rule', 'line'])
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class GeneratorError(Exception):
+    pass
+
+
+class PuzzleGenerator(object):
+    def __init__(self, categories, seed=None, cluetypes=CLUE_WEIGHTS,
+                 maxclues=200, regexes=STANDARD_RULES):
+        self.categories = categories
+        self.random = random.Random(seed)
+        self.cluetypes = cluetypes
+        self.maxclues = maxclues
+
+        self._poss = self.categories.possibilities()
+
+        # private copies of the regex objects so that other RulesFromText
+        # instances (with other categories) can't re-format them under us
+        self._parser = rulelist.RulesFromText(
+            rulelines=[],
+            categories=self.categories,
+            regexes=[copy.copy(regex) for regex in regexes]
+        )
+
+        self._values = [list(cat.values) for cat in self.categories]
+        self._numeric = [
+            i for (i, cat) in enumerate(self.categories)
+            if getattr(cat.dtype, 'kind', 'O') in 'iuf'
+        ]
+
+        # values that live in more than one category can't be used in a clue
+        # (val_filter wouldn't know which column we meant)
+        seen = collections.Counter(v for vals in self._values for v in vals)
+        self._ambiguous = {v for (v, n) in seen.items() if n > 1}
+
+    def generate(self):
+        """ pick a hidden solution, find a set of clues that pins it down, and
+            minimize that set
+
+        """
+        rows = self.hidden_solution()
+        (clues, engine) = self._sufficient_clues(rows)
+        clues = self.minimize(clues, engine)
+        return GeneratedPuzzle(
+            solution=self.solution_frame(rows),
+            rules=[clue.rule for clue in clues],
+            lines=[clue.line for clue in clues],
+        )
+
+    def hidden_solution(self):
+        """ one tuple of values per entity. The first category is kept in
+            order, the rest are shuffled
+
+        """
+        cols = [self._values[0]]
+        for vals in self._values[1:]:
+            vals = list(vals)
+            self.random.shuffle(vals)
+            cols.append(vals)
+        return zip(*cols)
+
+    def solution_frame(self, rows):
+        """ the hidden solution in the same format as LogicPuzzle.solution
+            (including the row labels of Categories.possibilities)
+
+        """
+        soln = self._poss.loc[self.categories.row_labels(rows)].copy()
+        soln.loc[:, common.STATUS] = common.CONFIRMED
+        return self.categories.display(soln)
+
+    # clue selection
+    def sufficient_clues(self, rows):
+        """ keep adding random true clues, propagating from the current state
+            each time, until our solver can finish the puzzle
+
+        """
+        return self._sufficient_clues(rows)[0]
+
+    def _sufficient_clues(self, rows):
+        """ (clues, engine), the engine holding the clues compiled in order """
+        engine = tensor.TensorEngine([(self.categories, [])])
+        clues = []
+        keys = set()
+        batch = len(self.categories)
+        while True:
+            new = []
+            for i in range(batch):
+                clue = self.random_clue(rows)
+                if clue is None:
+                    continue
+                key = (clue.rule.f, tuple(sorted(clue.rule.params.items())))
+                if key not in keys:
+                    keys.add(key)
+                    new.append(clue)
+            clues += new
+
+            if len(clues) > self.maxclues:
+                msg = "no unique solution after {} clues".format(len(clues))
+                raise GeneratorError(msg)
+
+            # clues only ever reject more, so we carry on from where the
+            # last round left off
+            engine.extend([c.rule for c in new])
+            engine.propagate()
+            if engine.solved()[0]:
+                return (clues, engine)
+
+    def minimize(self, clues, engine=None):
+        """ drop clues one at a time as long as the rest still solve the
+            puzzle.
+
+            The clues are compiled once (engine, if given, already holds
+            them in order), and each trial runs the subset of them still in
+            play. The state for the clues we've already decided to keep is
+            only ever propagated forward and every trial starts from it, so
+            no trial starts from the full possibilities table
+
+        """
+        full = engine or tensor.TensorEngine([(self.categories, [c.rule for c in clues])])
+        index = {id(clue): i for (i, clue) in enumerate(clues)}
+        base = full.subsets(np.zeros((1, len(clues)), dtype=bool))
+        base.possible[:] = True
+        base.confirmed[:] = False
+        keep = []
+        pending = list(clues)
+        self.random.shuffle(pending)
+        while pending:
+            clue = pending.pop()
+            trial = self._subset(full, base, keep + pending, index)
+            trial.propagate()
+            if trial.solved()[0]:
+                continue
+            keep.append(clue)
+            base = self._subset(full, base, keep, index)
+            base.propagate()
+
+        # put them back in the order we found them
+        return [clue for clue in clues if clue in keep]
+
+    def random_clue(self, rows):
+        """ a random clue that is true for rows, or None if we didn't manage
+            to make one this time around (e.g. the text didn't parse back)
+
+        """
+        kinds = sorted(self.cluetypes)
+        weights = [self.cluetypes[k] for k in kinds]
+        kind = self._weighted_choice(kinds, weights)
+        return getattr(self, '_clue_{}'.format(kind))(rows)
+
+    def _clue_same(self, rows):
+        row = self.random.choice(rows)
+        (a, b) = self.random.sample(row, 2)
+        return self._clue(
+            rule.Rule(rule.is_same, filt1=a, filt2=b),
+            '{} was {}.'.format(a, b)
+        )
+
+    def _clue_diff(self, rows):
+        (r1, r2) = self.random.sample(rows, 2)
+        (i, j) = self.random.sample(range(len(self.categories)), 2)
+        (a, b) = (r1[i], r2[j])
+        return self._clue(
+            rule.Rule(rule.is_diff, filt1=a, filt2=b),
+            "{} wasn't {}.".format(a, b)
+        )
+
+    def _clue_either(self, rows):
+        (r1, r2) = self.random.sample(rows, 2)
+        (i, j, k) = [
+            self.random.randrange(len(self.categories)) for _ in range(3)
+        ]
+        if i == j:
+            return None
+        (x, y, z) = (r1[i], r1[j], r2[k])
+        if self.random.random() < .5:
+            (y, z) = (z, y)
+        return self._clue(
+            rule.Rule(rule.is_either_or, isfilt=x, eitherfilt=y, orfilt=z),
+            '{} was either {} or {}.'.format(x, y, z)
+        )
+
+    def _clue_increment(self, rows):
+        if not self._numeric:
+            return None
+        c = self.random.choice(self._numeric)
+        others = [i for i in range(len(self.categories)) if i != c]
+        (r1, r2) = self.random.sample(rows, 2)
+        if r1[c] < r2[c]:
+            (r1, r2) = (r2, r1)
+        (big, small) = (r1[self.random.choice(others)], r2[self.random.choice(others)])
+        offset = r1[c] - r2[c]
+        catname = self.categories[c].name
+        if self.random.random() < .5:
+            line = '{} had {} more {} than {}.'.format(big, offset, catname, small)
+        else:
+            line = '{} had {} fewer {} than {}.'.format(small, offset, catname, big)
+        return self._clue(
+            rule.Rule(
+                rule.is_incremented, compCat=catname, bigfilt=big,
+                smallfilt=small, offset=offset
+            ),
+            line
+        )
+
+    def _clue(self, r, line):
+        """ only keep clues whose text parses back into the same rule """
+        if any(v in self._ambiguous for v in r.params.values()):
+            return None
+        try:
+            parsed = self._parser.parse(line)
+        except rulelist.RuleError:
+            return None
+        if parsed.f is not r.f or parsed.params != r.params:
+            return None
+        return Clue(rule=parsed, line=line)
+
+    # utilities
+    def _subset(self, full, base, clues, index):
+        """ the puzzle with just clues (compiled in full), at base's state """
+        active = np.zeros((1, len(index)), dtype=bool)
+        active[0, [index[id(clue)] for clue in clues]] = True
+        e = full.subsets(active)
+        (e.possible, e.confirmed) = (base.possible.copy(), base.confirmed.copy())
+        return e
+
+    def _weighted_choice(self, choices, weights):
+        x = self.random.uniform(0, sum(weights))
+        for (c, w) in zip(choices, weights):
+            x -= w
+            if x <= 0:
+                return c
+        return choices[-1]
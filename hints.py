@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: hints.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    "what's the next logical step?" for interactive front ends: the single
+    cheapest rule application (or clean_up) that makes progress from the
+    current state of a puzzle, without taking it.
+
+    Rules are tried one at a time on the numpy row masks of a one puzzle
+    TensorEngine (see tensor.py) instead of on the DataFrame, cheap rules
+    (is_same, is_diff) before the comparisons and clean_up last. A rule
+    that had nothing to do is remembered as quiet, and only tried again
+    once a row it looks at (a row with one of its values) has changed; so
+    asking again after taking a step only re-checks the rules that step
+    could have woken up.
+
+    Rules the engine can't handle (filter functions) are tried on the
+    DataFrame instead, which is correct but slow
+
+Usage:
+    d = p.next_deduction()      # see LogicPuzzle.next_deduction
+    d.source, d.rule, d.rejected, d.confirmed
+    p.apply_deduction(d)        # take the step
+
+"""
+
+import collections
+
+import numpy as np
+
+import categories as categories_
+import common
+import encoded
+import provenance
+import rule
+import tensor
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+# cheapest first; anything else goes after these
+COST = {
+    'is_same': 0,
+    'is_diff': 0,
+    'similarity_group_updates': 1,
+    'is_one_of': 1,
+    'is_either_or': 1,
+    'is_neither_nor': 1,
+    'pair_is_pair': 2,
+    'is_ordered': 3,
+    'is_incremented': 3,
+}
+
+# source is the position of the rule in LogicPuzzle.rules (or
+# provenance.CLEAN_UP), rule that rule (or rule.clean_up), and rejected /
+# confirmed the labels of the rows the step changes
+Deduction = collections.namedtuple(
+    'Deduction', ['source', 'rule', 'rejected', 'confirmed']
+)
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class HintError(Exception):
+    pass
+
+
+class Hints(object):
+    def __init__(self, categories, rules):
+        self.categories = categories
+        self.rules = rules
+        self.order = sorted(
+            range(len(rules)), key=lambda i: COST.get(rules[i].f.__name__, 4)
+        )
+        try:
+            self.engine = tensor.TensorEngine([(categories, rules)])
+        except (tensor.TensorError, categories_.CategoriesError):
+            self.engine = None
+
+        if self.engine is not None:
+            self.touched = self.engine.touched(0)
+
+        self.quiet = set()
+        self.cleanquiet = False
+        self.state = None
+
+    def next(self, df):
+        """ the next Deduction from table df (a LogicPuzzle.df), or None """
+        (possible, confirmed) = encoded.row_state(df, self.categories)
+        self.wake(possible, confirmed)
+        self.state = (possible, confirmed)
+
+        if self.engine is not None:
+            self.engine.possible[0] = possible
+            self.engine.confirmed[0] = confirmed
+
+        for i in self.order:
+            if i in self.quiet:
+                continue
+            rejected = self.rejects(i, df)
+            if rejected.size:
+                return Deduction(i, self.rules[i], rejected, np.array([], dtype=np.int64))
+            self.quiet.add(i)
+
+        if not self.cleanquiet:
+            (rejected, confirmed) = self.cleans_up(df)
+            if rejected.size or confirmed.size:
+                return Deduction(provenance.CLEAN_UP, rule.clean_up, rejected, confirmed)
+            self.cleanquiet = True
+
+        return None
+
+    def wake(self, possible, confirmed):
+        """ forget that rules were quiet if rows they look at changed """
+        if self.state is None:
+            return
+        changed = possible != self.state[0]
+        if changed.any() or (confirmed != self.state[1]).any():
+            self.cleanquiet = False
+        if not changed.any():
+            return
+        if self.engine is None:
+            self.quiet = set()
+            return
+        self.quiet = {i for i in self.quiet if not (self.touched[i] & changed).any()}
+
+    # one step
+    def rejects(self, i, df):
+        """ labels of the rows rule i would reject """
+        if self.engine is not None:
+            return np.flatnonzero(self.engine.rejects(0, i))
+        after = self.rules[i](df)
+        return np.asarray(df.index)[
+            (common.is_possible(df) & ~common.is_possible(after)).values
+        ]
+
+    def cleans_up(self, df):
+        """ labels of the rows clean_up would (reject, confirm) """
+        if self.engine is not None:
+            (rejected, confirmed) = self.engine.cleans_up()
+            return (np.flatnonzero(rejected[0]), np.flatnonzero(confirmed[0]))
+        after = rule.clean_up(df)
+        labels = np.asarray(df.index)
+        isconfirmed = lambda d: (d[common.STATUS] == common.CONFIRMED).values
+        return (
+            labels[(common.is_possible(df) & ~common.is_possible(after)).values],
+            labels[isconfirmed(after) & ~isconfirmed(df)],
+        )
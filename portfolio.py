@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: portfolio.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    portfolio solving. No single rule order or engine wins on every puzzle,
+    so we run several differently configured solves of the same puzzle at
+    once, one process each, take whichever finishes first and kill the rest.
+
+    A strategy is a dict:
+        engine      - 'propagate' (LogicPuzzle) or 'exactcover'
+        order       - rule order for 'propagate': 'given', 'reversed' or
+                      'shuffled' (with 'seed')
+        heuristic   - branching column choice for 'exactcover' ('mrv' or
+                      'first'); see ExactCover
+    and every strategy returns the solution as one tuple of values per
+    entity, in category order
+
+Usage:
+    (strategy, rows) = solve_portfolio(categories, rules)
+    p.solve_portfolio()     # the same, from a LogicPuzzle
+
+"""
+
+import multiprocessing
+import Queue
+import random
+import time
+
+import exactcover
+import puzzle
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+STRATEGIES = [
+    {'engine': 'propagate', 'order': 'given'},
+    {'engine': 'exactcover', 'heuristic': 'mrv'},
+    {'engine': 'propagate', 'order': 'reversed'},
+    {'engine': 'propagate', 'order': 'shuffled', 'seed': 0},
+    {'engine': 'exactcover', 'heuristic': 'first'},
+    {'engine': 'propagate', 'order': 'shuffled', 'seed': 1},
+]
+
+# seconds between checks on the deadline / dead workers
+POLL = .1
+
+
+# ----------------------------- #
+#   strategies                  #
+# ----------------------------- #
+
+class PortfolioError(Exception):
+    pass
+
+
+def run_strategy(categories, rules, strategy):
+    """ solve with one strategy; raise PortfolioError if it can't """
+    engine = strategy.get('engine', 'propagate')
+    if engine == 'propagate':
+        return _propagate(categories, rules, strategy)
+    elif engine == 'exactcover':
+        return _exactcover(categories, rules, strategy)
+    else:
+        raise PortfolioError("unknown engine {}".format(engine))
+
+
+def _propagate(categories, rules, strategy):
+    rules = list(rules)
+    order = strategy.get('order', 'given')
+    if order == 'reversed':
+        rules.reverse()
+    elif order == 'shuffled':
+        random.Random(strategy.get('seed')).shuffle(rules)
+    elif order != 'given':
+        raise PortfolioError("unknown rule order {}".format(order))
+
+    p = puzzle.LogicPuzzle(
+        categories, rules,
+        maxsolveattempts=strategy.get('maxsolveattempts', 10),
+        keephistory=False
+    )
+    try:
+        p.solve()
+    except puzzle.LogicPuzzleError as e:
+        raise PortfolioError(str(e))
+
+    return p.solution_rows()
+
+
+def _exactcover(categories, rules, strategy):
+    try:
+        ec = exactcover.ExactCover(
+            categories, rules, heuristic=strategy.get('heuristic', 'mrv')
+        )
+        solns = list(ec.solutions(limit=2))
+    except exactcover.ExactCoverError as e:
+        raise PortfolioError(str(e))
+    if len(solns) != 1:
+        raise PortfolioError("found {} solutions".format(len(solns)))
+    return solns[0]
+
+
+def _worker(categories, rules, strategy, i, q):
+    try:
+        q.put((i, run_strategy(categories, rules, strategy), None))
+    except Exception as e:
+        q.put((i, None, '{}: {}'.format(type(e).__name__, e)))
+
+
+# ----------------------------- #
+#   the portfolio               #
+# ----------------------------- #
+
+def solve_portfolio(categories, rules, strategies=None, processes=None,
+                    timeout=None):
+    """ run up to processes (default: one per cpu) strategies at once and
+        return (strategy, rows) for the first one to succeed. Everything
+        still running at that point is terminated
+
+    """
+    strategies = STRATEGIES if strategies is None else strategies
+    processes = processes or multiprocessing.cpu_count()
+    strategies = strategies[:processes]
+    if not strategies:
+        raise PortfolioError("no strategies to run")
+
+    q = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(
+            target=_worker, args=(categories, rules, strategy, i, q)
+        )
+        for (i, strategy) in enumerate(strategies)
+    ]
+    for proc in procs:
+        proc.daemon = True
+        proc.start()
+
+    deadline = None if timeout is None else time.time() + timeout
+    errors = {}
+    try:
+        while len(errors) < len(procs):
+            try:
+                (i, rows, err) = q.get(timeout=POLL)
+            except Queue.Empty:
+                if deadline is not None and time.time() >= deadline:
+                    raise PortfolioError("no strategy finished in time")
+                if q.empty() and not any(proc.is_alive() for proc in procs):
+                    # somebody died without reporting back
+                    break
+                continue
+            if err is None:
+                return (strategies[i], rows)
+            errors[i] = err
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+            proc.join()
+
+    msg = "no strategy succeeded: {}".format(
+        '; '.join('{}: {}'.format(strategies[i], e) for (i, e) in sorted(errors.items()))
+    )
+    raise PortfolioError(msg)
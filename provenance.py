@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: provenance.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    record of which rule rejected which row, and in which solve iteration.
+
+    Instead of keeping whole tables around (LogicPuzzle.history) we keep
+    three small integer arrays indexed by row label (the row position in
+    Categories.possibilities()): the id of the rule that first rejected the
+    row, the iteration it happened in, and the iteration the row was
+    confirmed in (if it was). That's 12 bytes per row, and recording a step
+    is one vectorized pass over the table.
+
+    Rule ids are positions in LogicPuzzle.rules; the negative ids below mark
+    rows that weren't rejected by a rule
+
+Usage:
+    p = LogicPuzzle(categories, rules, keepprovenance=True)
+    p.solve()
+    p.provenance.why(label)     # (ruleid, iteration) or None
+    p.provenance.never_pruned(range(len(p.rules)))
+
+"""
+
+import collections
+import numpy as np
+
+import common
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+NOT_REJECTED = -1
+CLEAN_UP = common.CLEAN_UP
+EXTERNAL = common.EXTERNAL
+PROBE = common.PROBE
+
+NAMES = {
+    NOT_REJECTED: 'not rejected',
+    CLEAN_UP: 'clean_up',
+    EXTERNAL: 'external',
+    PROBE: 'probe',
+}
+
+# ProvenanceLog.confirmed of the rows that aren't
+NOT_CONFIRMED = -1
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class ProvenanceError(Exception):
+    pass
+
+
+class ProvenanceLog(object):
+    def __init__(self, nrows):
+        self.nrows = nrows
+        self.rule = np.full(nrows, NOT_REJECTED, dtype=np.int32)
+        self.iteration = np.zeros(nrows, dtype=np.int32)
+        self.confirmed = np.full(nrows, NOT_CONFIRMED, dtype=np.int32)
+
+    def record(self, ruleid, iteration, df):
+        """ attribute every row of df that is rejected but not yet in the log
+            to ruleid (or, for an array of rule ids by row label, to its
+            entry), and note the iteration of any new confirmations.
+            Rejections are never taken back (outside of undo, which the log
+            doesn't follow), so the first one is the one we want
+
+        """
+        status = df[common.STATUS].values
+        labels = np.asarray(df.index)
+        rejected = labels[status == common.REJECTED]
+        fresh = rejected[self.rule[rejected] == NOT_REJECTED]
+        self.rule[fresh] = ruleid[fresh] if isinstance(ruleid, np.ndarray) else ruleid
+        self.iteration[fresh] = iteration
+
+        confirmed = labels[status == common.CONFIRMED]
+        confirmed = confirmed[self.confirmed[confirmed] == NOT_CONFIRMED]
+        self.confirmed[confirmed] = iteration
+        return fresh.size
+
+    def rollback(self, df):
+        """ forget the rejections of rows that are possible again in df (the
+            table LogicPuzzle.remove_rule is going back to). Rows compacted
+            out of df were rejected in it, so they stay as they are
+
+        """
+        possible = common.is_possible(df).values
+        labels = np.asarray(df.index)[possible]
+        self.rule[labels] = NOT_REJECTED
+        self.iteration[labels] = 0
+        unsure = np.asarray(df.index)[(df[common.STATUS] == common.UNSURE).values]
+        self.confirmed[unsure] = NOT_CONFIRMED
+
+    def drop_rule(self, ruleid):
+        """ rule ruleid is gone, so the ones after it move up a place """
+        if self.rejected_by(ruleid).size:
+            raise ProvenanceError("rule {} still has rejections".format(ruleid))
+        self.rule[self.rule > ruleid] -= 1
+
+    # queries
+    def why(self, label):
+        """ (ruleid, iteration) that rejected row label, or None """
+        if not 0 <= label < self.nrows:
+            raise ProvenanceError("no row {}".format(label))
+        ruleid = int(self.rule[label])
+        if ruleid == NOT_REJECTED:
+            return None
+        return (ruleid, int(self.iteration[label]))
+
+    def rejected_by(self, ruleid):
+        """ labels of the rows ruleid rejected """
+        return np.flatnonzero(self.rule == ruleid)
+
+    def counts(self):
+        """ {ruleid: number of rows it rejected} """
+        (ids, n) = np.unique(self.rule, return_counts=True)
+        return collections.Counter({
+            int(i): int(c) for (i, c) in zip(ids, n) if i != NOT_REJECTED
+        })
+
+    def never_pruned(self, ruleids):
+        """ the ruleids that didn't reject a single row """
+        counts = self.counts()
+        return [i for i in ruleids if not counts[i]]
+
+    def nbytes(self):
+        return self.rule.nbytes + self.iteration.nbytes + self.confirmed.nbytes
@@ -14,16 +14,44 @@ Usage:
 
 """
 
+import collections
+import cPickle
+import os
 import pandas as pd
+import time
 
+import categories as categories_
 import common
 import rule
 
+# the optional engines (portfolio, exactcover, tensor, fused, hints, encoded,
+# provenance) are imported by the methods that use them, so that importing
+# puzzle for a plain solve doesn't pay for them
+
 
 # ----------------------------- #
 #   Module Constants            #
 # ----------------------------- #
 
+# what solve hands back. confirmed is a list of ((cat, val), (cat, val))
+# pairs we are sure of, domains maps each entity (value of the first
+# category) to {category: [still possible values]}, and progress is the
+# fraction of the way from the full table to one row per entity
+PartialSolution = collections.namedtuple(
+    'PartialSolution', ['confirmed', 'domains', 'progress', 'solved', 'expired']
+)
+
+# what iter_solve yields after each step. source is the rule position (None
+# for a fused sweep, see fused.py), common.CLEAN_UP or common.PROBE,
+# confirmed the confirmed pairs (as in PartialSolution) that are new since
+# the last record, remaining the number of rows still possible, and elapsed
+# the seconds since iter_solve started
+SolveProgress = collections.namedtuple(
+    'SolveProgress',
+    ['iteration', 'source', 'confirmed', 'remaining', 'elapsed', 'solved', 'expired']
+)
+
+
 # ----------------------------- #
 #   Main class                  #
 # ----------------------------- #
@@ -32,15 +60,102 @@ class LogicPuzzleError(Exception):
     pass
 
 
+class LogicPuzzleTimeout(LogicPuzzleError):
+    pass
+
+
+class LogicPuzzleContradiction(LogicPuzzleError):
+    """ some category value has no possible rows left. source is the rule
+        position (or provenance id) of the step that emptied it, empty the
+        (category, value)-s with nothing left, and core (filled in by solve)
+        the positions of a minimal set of rules that contradict each other
+
+    """
+    def __init__(self, msg, source=None, empty=None, core=None):
+        super(LogicPuzzleContradiction, self).__init__(msg)
+        self.source = source
+        self.empty = empty or []
+        self.core = core
+
+
 class LogicPuzzle(object):
-    def __init__(self, categories, rules, maxsolveattempts=10):
+    def __init__(self, categories, rules, maxsolveattempts=10, df=None,
+                 keephistory=True, compactthreshold=.5, checkpointpath=None,
+                 checkpointinterval=60, keepprovenance=False, probebudget=None,
+                 fused=False):
+        """ df, if provided, is a possibility table (e.g. a copy of a
+            partially propagated one) to start from instead of rebuilding
+            categories.possibilities(). keephistory=False skips the per-step
+            copies in self.history (and with them, undo).
+
+            Once fewer than compactthreshold of the rows in df are still
+            possible, the rejected ones are dropped (see compact); None turns
+            that off.
+
+            With a checkpointpath, solve writes a checkpoint there (see
+            checkpoint) at most every checkpointinterval seconds and again
+            if it runs out of time. The rules then have to be picklable
+            (no filter functions), which is checked up front.
+
+            keepprovenance=True keeps a provenance.ProvenanceLog of which rule
+            rejected each row (see why).
+
+            probebudget turns on failed literal probing (see probe) after
+            each clean_up, with at most that many probes per iteration
+
+            fused=True runs the rules fused.py can handle as one vectorized
+            sweep instead of one at a time
+
+        """
         self.categories = categories
         self.rules = rules
         self.history = []
+        self.keephistory = keephistory
+        self.compactthreshold = compactthreshold
         self._df = pd.DataFrame()
+        self._version = 0
+        self._views = {}
         self._solve_attempts = 0
+        self._deadline = None
+        self._rulepos = 0
+        self._trail = []
+        self.probebudget = probebudget
+        self._probed = set()
+        self._prober = None
+        self._hints = None
+        self.fused = fused
+        self._sweep = None
+        self.checkpointpath = checkpointpath
+        if checkpointpath:
+            self.check_checkpointable(rules)
+        self.checkpointinterval = checkpointinterval
+        self._lastcheckpoint = time.time()
         self.maxsolveattempts = maxsolveattempts
-        self.df = self.categories.possibilities()
+        self.provenance = None
+        self._source = common.EXTERNAL
+        if keepprovenance:
+            import provenance
+            self.provenance = provenance.ProvenanceLog(self.categories.nrows)
+        self.df = self.categories.possibilities() if df is None else df
+
+    @classmethod
+    def resume(cls, path, **kwargs):
+        """ pick a solve back up from a file written by checkpoint. The table
+            is decoded straight from the file, so neither
+            categories.possibilities() nor the rule text is needed again;
+            kwargs go to __init__ and override what was saved
+
+        """
+        import encoded
+        table = encoded.MappedTable(path, mode='r')
+        state = cPickle.loads(table.meta)
+        categories = state.pop('categories')
+        rules = state.pop('rules')
+        state.update(kwargs)
+        p = cls(categories, rules, df=table.decode(categories), **state)
+        p._solve_attempts = table.header['iteration']
+        p._rulepos = table.header['rulepos']
+        return p
 
     @property
     def df(self):
@@ -49,31 +164,757 @@ class LogicPuzzle(object):
 
     @df.setter
     def df(self, df):
-        self.history.append(self._df.copy())
+        if self.keephistory:
+            self.history.append(self._df.copy())
+        self._set_df(df)
+        if self.provenance is not None:
+            self.provenance.record(self._source, self._solve_attempts, df)
+
+    def _set_df(self, df):
         self._df = df
+        self._version += 1
+
+    @property
+    def version(self):
+        """ goes up every time the table is replaced. Tables are never
+            modified in place (rules always hand back new ones), so two reads
+            with the same version saw the same statuses
+
+        """
+        return self._version
+
+    def _view(self, name, build):
+        """ build(), computed once per version of the table """
+        (version, value) = self._views.get(name, (None, None))
+        if version != self._version:
+            value = build()
+            self._views[name] = (self._version, value)
+        return value
+
+    @property
+    def full_df(self):
+        """ df padded back out to every row of categories.possibilities(),
+            with the rows dropped by compact marked as rejected. Always a new
+            table: the live one may be shared (e.g. a PuzzleTemplate's)
+
+        """
+        if self._df.shape[0] == self.categories.nrows:
+            return self._df.copy()
+        full = self.categories.possibilities()
+        full.loc[:, common.STATUS] = common.REJECTED
+        full.loc[self._df.index, common.STATUS] = self._df[common.STATUS]
+        return full
 
     @property
     def poss(self):
-        return self.df[common.is_possible(self.df)]
+        """ the rows still possible, with values as the table keeps them
+            (month categories as ordinals); cached until the table changes,
+            so don't modify it
+
+        """
+        return self._view('poss', lambda: self.df[common.is_possible(self.df)])
 
     @property
     def solution(self):
+        """ the confirmed rows, with month categories turned back into months
+            (see Categories.display); cached like poss
+
+        """
+        return self._view('solution', lambda: self.categories.display(self._confirmed()))
+
+    def _confirmed(self):
         return self.df[self.df[common.STATUS] == common.CONFIRMED]
 
     def undo(self):
-        self._df = self.history.pop()
+        self._set_df(self.history.pop())
+
+    def compact(self, threshold=None):
+        """ physically drop the rejected rows from the live table once fewer
+            than threshold (default self.compactthreshold) of its rows are
+            still possible, so that the rules stop scanning them.
+
+            Row labels are untouched, so they still map back to the original
+            rows of categories.possibilities() (see full_df), and undo still
+            steps back through the uncompacted tables in history
+
+        """
+        threshold = self.compactthreshold if threshold is None else threshold
+        if threshold is None or self._df.empty:
+            return
+        live = common.is_possible(self._df)
+        if live.mean() < threshold:
+            self._set_df(self._df[live])
+
+    def solve(self, timebudget=None, deadline=None):
+        """ solve the puzzle, or get as far as we can before deadline (a
+            time.time() value) or timebudget seconds from now, whichever
+            comes first. The clock is checked between rule applications.
+
+            Either way we return a PartialSolution; check its solved / expired
+            flags.
+
+            If a step leaves some category value with no possible rows we
+            stop right there and raise LogicPuzzleContradiction, with the
+            rules to blame in its core (see conflict_core)
+
+        """
+        expired = False
+        for (source, expired) in self._solve_steps(timebudget, deadline):
+            pass
+        return self.partial_solution(expired=expired)
+
+    def iter_solve(self, timebudget=None, deadline=None):
+        """ solve one step at a time: a generator that does what solve does
+            and yields a SolveProgress after every rule application (or fused
+            sweep), clean_up and probe. Nothing in a record is a copy of the
+            table; read self.poss / self.solution (both cached) for that.
+
+            Stopping early (just stop iterating) leaves the puzzle where it
+            was, and a later solve or iter_solve carries on from there, so
+            e.g. several puzzles can take turns in one thread (see
+            interleave). Running out of time yields one last record with
+            expired set; a contradiction is raised as in solve
+
+        """
+        progress = self._progress()
+        start = time.time()
+        steps = self._solve_steps(timebudget, deadline)
+        try:
+            for (source, expired) in steps:
+                yield progress(source, start, expired)
+        finally:
+            steps.close()
+
+    def _solve_steps(self, timebudget, deadline):
+        """ solve, yielding (source, expired) after every step """
+        if timebudget is not None:
+            budgetend = time.time() + timebudget
+            deadline = budgetend if deadline is None else min(deadline, budgetend)
+        self._deadline = deadline
+
+        try:
+            while not self.solved():
+                # a resumed (or timed out) solve picks its sweep back up
+                # where it left off rather than starting a new one
+                if self._rulepos == 0:
+                    self._solve_attempts += 1
+                    self.compact()
+                for source in self._rule_steps(detect=True):
+                    yield (source, False)
+                self.check_deadline()
+                self._apply(rule.clean_up, common.CLEAN_UP)
+                self.check_consistent(common.CLEAN_UP)
+                self._rulepos = 0
+                yield (common.CLEAN_UP, False)
+                if self.probebudget and not self.solved():
+                    if self.probe():
+                        self.check_consistent(common.PROBE)
+                    yield (common.PROBE, False)
+                if self.maxsolveattempts and (self._solve_attempts >= self.maxsolveattempts):
+                    raise LogicPuzzleError("reached maximum number of solution iterations")
+        except LogicPuzzleTimeout:
+            if self.checkpointpath:
+                self.checkpoint()
+            yield (None, True)
+        except LogicPuzzleContradiction as e:
+            e.core = self.conflict_core()
+            raise e
+        finally:
+            self._deadline = None
+
+    def _progress(self):
+        """ progress(source, start) -> the SolveProgress for where we are
+            now, with the confirmed pairs that weren't in the last one.
+            Pairs only depend on the possible rows, which only ever go away,
+            so they are only looked at again when some did
+
+        """
+        seen = set(self.confirmed_pairs())
+        last = [int(common.is_possible(self.df).sum())]
+
+        def progress(source, start, expired=False):
+            # counted off the status column; self.poss would build a new
+            # frame for every version of the table just to count it
+            remaining = int(common.is_possible(self.df).sum())
+            new = []
+            if remaining != last[0]:
+                new = [pair for pair in self.confirmed_pairs() if pair not in seen]
+                seen.update(new)
+                last[0] = remaining
+            return SolveProgress(
+                iteration=self._solve_attempts,
+                source=source,
+                confirmed=new,
+                remaining=remaining,
+                elapsed=time.time() - start,
+                solved=self.solved(),
+                expired=expired,
+            )
+
+        return progress
+
+    def solve_portfolio(self, strategies=None, processes=None, timeout=None):
+        """ solve with several strategies at once (see portfolio.py) and keep
+            whichever finishes first: its rows are confirmed, everything
+            else rejected. Returns the winning strategy
+
+        """
+        import portfolio
+        (strategy, rows) = portfolio.solve_portfolio(
+            self.categories, self.rules, strategies=strategies,
+            processes=processes, timeout=timeout
+        )
+        self.set_solution(rows)
+        return strategy
+
+    def set_solution(self, rows):
+        """ take rows (one tuple of values per entity, in category order) as
+            the solution: confirm them and reject everything else
+
+        """
+        df = self.df.copy()
+        df.loc[:, common.STATUS] = common.REJECTED
+        labels = df.index.intersection(self.categories.row_labels(rows))
+        df.loc[labels, common.STATUS] = common.CONFIRMED
+        self.df = df
+
+    def solution_rows(self):
+        """ the solution in the format set_solution takes """
+        soln = self._confirmed()
+        return sorted(
+            zip(*[soln[name].tolist() for name in self.categories.names]),
+            key=lambda row: self.categories.row_labels([row])[0]
+        )
+
+    def add_rule(self, r):
+        """ add one rule and propagate from where we are now instead of from
+            scratch (parse text with e.g. RulesFromText.parse first). The
+            table from just before is remembered so that remove_rule can go
+            back to it. Returns whether the puzzle is solved
+
+        """
+        if self.checkpointpath:
+            self.check_checkpointable([r])
+        self._trail.append((r, self._df))
+        self.rules = list(self.rules) + [r]
+        self._rulepos = 0
+        return self.propagate()
+
+    def remove_rule(self, r):
+        """ remove a rule (the Rule itself or its position in self.rules).
+
+            For a rule that came in through add_rule we go back to the table
+            from just before it was added and add the rules added after it
+            again; anything else was there from the start, so we start over
+            from categories.possibilities(). Returns whether the puzzle is
+            solved
+
+        """
+        ruleid = r if isinstance(r, int) else self._rule_position(r)
+
+        # the rules added through add_rule are the last len(self._trail) of
+        # self.rules, unless somebody has replaced self.rules since
+        ntrail = len(self._trail)
+        fixed = self.rules[:len(self.rules) - ntrail]
+        added = list(self.rules[len(fixed):])
+        if [trailrule for (trailrule, df) in self._trail] != added:
+            (fixed, added, self._trail) = (list(self.rules), [], [])
+
+        if ruleid >= len(fixed):
+            i = ruleid - len(fixed)
+            df = self._trail[i][1]
+            replay = added[i + 1:]
+            self._trail = self._trail[:i]
+            self.rules = fixed + added[:i]
+        else:
+            df = self.categories.possibilities()
+            replay = added
+            self._trail = []
+            self.rules = fixed[:ruleid] + fixed[ruleid + 1:]
+
+        if self.provenance is not None:
+            self.provenance.rollback(df)
+            self.provenance.drop_rule(ruleid)
+        self._rulepos = 0
+        self.df = df
+        self.propagate()
+        for trailrule in replay:
+            self.add_rule(trailrule)
+        return self.solved()
+
+    def _rule_position(self, r):
+        for (i, x) in enumerate(self.rules):
+            if x is r:
+                return i
+        raise LogicPuzzleError("{} is not one of our rules".format(r))
 
-    def solve(self):
+    def check_deadline(self):
+        if self._deadline is not None and time.time() >= self._deadline:
+            raise LogicPuzzleTimeout("ran out of time")
+
+    def checkpoint(self, path=None):
+        """ write everything resume needs to path (default
+            self.checkpointpath): the encoded table (see encoded.py), the
+            iteration count and our position in the rule list as a mapped
+            table, and the categories, rules and options pickled into its
+            meta block.
+
+            The file is written next to path and renamed over it, so a crash
+            part way through leaves the previous checkpoint intact
+
+        """
+        path = path or self.checkpointpath
+        if not path:
+            raise LogicPuzzleError("no checkpoint path")
+        self.check_checkpointable(self.rules)
+        import encoded
+        (index, codes, status) = encoded.encode(self._df, self.categories)
+        meta = cPickle.dumps({
+            'categories': self.categories,
+            'rules': list(self.rules),
+            'maxsolveattempts': self.maxsolveattempts,
+            'compactthreshold': self.compactthreshold,
+        }, cPickle.HIGHEST_PROTOCOL)
+
+        tmp = '{}.tmp'.format(path)
+        table = encoded.MappedTable.create(
+            tmp, index, codes, status, meta=meta,
+            iteration=self._solve_attempts, rulepos=self._rulepos
+        )
+        del table
+        os.rename(tmp, path)
+        self._lastcheckpoint = time.time()
+
+    def check_checkpointable(self, rules):
+        """ raise LogicPuzzleError unless rules can go in a checkpoint;
+            rules built on filter functions (e.g. common.catval_filter)
+            can't be pickled
+
+        """
+        try:
+            cPickle.dumps(list(rules), cPickle.HIGHEST_PROTOCOL)
+        except (cPickle.PicklingError, TypeError) as e:
+            raise LogicPuzzleError("rules can't be checkpointed: {}".format(e))
+
+    def maybe_checkpoint(self):
+        if self.checkpointpath and (
+                time.time() - self._lastcheckpoint >= self.checkpointinterval):
+            self.checkpoint()
+
+    def propagate(self):
+        """ apply the rules and clean up until the puzzle is solved or a full
+            sweep changes nothing. Unlike solve, a stalled puzzle is not an
+            error; return whether or not we got to a solution
+
+        """
         while not self.solved():
-            self._solve_attempts += 1
+            if self._rulepos == 0:
+                self.compact()
+            before = self.df[common.STATUS]
             self.apply_rules()
-            self.df = rule.clean_up(self.df)
-            if self.maxsolveattempts and (self._solve_attempts >= self.maxsolveattempts):
-                raise LogicPuzzleError("reached maximum number of solution iterations")
+            self._apply(rule.clean_up, common.CLEAN_UP)
+            self._rulepos = 0
+            if self.df[common.STATUS].equals(before):
+                if not (self.probebudget and self.probe_all()):
+                    break
+        return self.solved()
+
+    def apply_rules(self, detect=False):
+        """ apply the rules in order, starting from self._rulepos (non-zero
+            only when an earlier sweep was interrupted); the caller resets it
+            once the sweep is cleaned up. With detect, check for a
+            contradiction after every rule
+
+        """
+        for source in self._rule_steps(detect):
+            pass
+
+    def _rule_steps(self, detect=False):
+        """ apply_rules, yielding the source (rule position, or None for the
+            fused sweep) after each step, with self._rulepos already past it
+            so that stopping there is the same as a timeout
+
+        """
+        sweep = self.fused_sweep()
+        while self._rulepos < len(self.rules):
+            self.check_deadline()
+            self.maybe_checkpoint()
+            if sweep is None or self._rulepos not in sweep.positions:
+                source = self._rulepos
+                self._apply(self.rules[source], source)
+                if detect:
+                    self.check_consistent(source)
+            elif self._rulepos == sweep.positions[0]:
+                # all of the fused rules at once, with each new rejection put
+                # down to its own rule
+                (df, owners) = sweep(self.df)
+                self._source = owners
+                try:
+                    self.df = df
+                finally:
+                    self._source = common.EXTERNAL
+                if detect:
+                    self.check_consistent(None)
+                source = None
+            else:
+                # taken care of by the fused sweep
+                self._rulepos += 1
+                continue
+            self._rulepos += 1
+            yield source
+
+    def fused_sweep(self):
+        """ the fused.FusedSweep for the current rules (None unless fused) """
+        if not self.fused:
+            return None
+        import fused
+        if self._sweep is None or self._sweep[0] is not self.rules:
+            try:
+                self._sweep = (self.rules, fused.FusedSweep(self.categories, self.rules))
+            except fused.FusedError:
+                self._sweep = (self.rules, None)
+        return self._sweep[1]
+
+    def _apply(self, f, source):
+        """ self.df = f(self.df), with any new rejections put down to source
+            in the provenance log (if we keep one)
+
+        """
+        self._source = source
+        try:
+            self.df = f(self.df)
+        finally:
+            self._source = common.EXTERNAL
+
+    def why(self, label):
+        """ (rule, iteration) that rejected row label, or None if it is still
+            possible; rule is one of self.rules or a provenance.NAMES entry.
+            Needs keepprovenance=True
+
+        """
+        if self.provenance is None:
+            raise LogicPuzzleError("provenance isn't being kept for this puzzle")
+        found = self.provenance.why(label)
+        if found is None:
+            return None
+        (ruleid, iteration) = found
+        if ruleid >= 0:
+            return (self.rules[ruleid], iteration)
+        import provenance
+        return (provenance.NAMES[ruleid], iteration)
+
+    def next_deduction(self):
+        """ the next logical step from where we are now, without taking it: a
+            hints.Deduction for the cheapest rule (or clean_up) that would
+            reject or confirm something, or None if nothing would. Take it
+            with apply_deduction
+
+        """
+        import hints
+        if self._hints is None or self._hints.rules is not self.rules:
+            self._hints = hints.Hints(self.categories, self.rules)
+        return self._hints.next(self._df)
+
+    def apply_deduction(self, d):
+        """ take the step next_deduction found (exactly the rows it lists) """
+        def step(df):
+            df2 = df.copy()
+            df2.loc[df2.index.intersection(d.rejected), common.STATUS] = common.REJECTED
+            df2.loc[df2.index.intersection(d.confirmed), common.STATUS] = common.CONFIRMED
+            return df2
+        self._apply(step, d.source)
+
+    def probe(self, budget=None):
+        """ failed literal probing: assert an unsure pairing col:val is
+            othercol:other, propagate, and if that leaves some category value
+            with no possible rows, the pairing is impossible and we reject it
+            for real.
+
+            Probes run on the numpy row state of a one puzzle
+            tensor.TensorEngine (see prober): a probe rejects rows and
+            propagates in place, with every entry it flips on the engine's
+            trail, and is undone by putting back just those, so nothing is
+            copied or compared per probe. Rules the engine can't run
+            (filter functions) fall back to propagating a trial LogicPuzzle.
+
+            At most budget (default self.probebudget) probes are made;
+            pairings probed without a result are skipped until every other
+            one has had a turn. Returns the number of pairings rejected
+
+        """
+        budget = self.probebudget if budget is None else budget
+        candidates = self.probe_candidates()
+        fresh = [c for c in candidates if c not in self._probed]
+        if not fresh:
+            self._probed.clear()
+            fresh = candidates
+        return self._probe(fresh[:budget])
+
+    def probe_all(self):
+        """ probe every candidate pairing, self.probebudget at a time, until
+            a batch rejects something; returns the number rejected (0 once
+            every pairing has been probed without a result)
+
+        """
+        candidates = self.probe_candidates()
+        budget = self.probebudget or max(len(candidates), 1)
+        for i in range(0, len(candidates), budget):
+            nfailed = self._probe(candidates[i:i + budget])
+            if nfailed:
+                return nfailed
+        return 0
+
+    def prober(self):
+        """ the one puzzle tensor.TensorEngine probes run on, for the current
+            rules (None if it can't run them)
+
+        """
+        import tensor
+        if self._prober is None or self._prober[0] is not self.rules:
+            try:
+                engine = tensor.TensorEngine([(self.categories, self.rules)])
+            except (tensor.TensorError, categories_.CategoriesError):
+                engine = None
+            self._prober = (self.rules, engine)
+        return self._prober[1]
+
+    def _probe(self, pairings):
+        engine = self.prober()
+        if engine is not None:
+            import encoded
+            (engine.possible[0], engine.confirmed[0]) = encoded.row_state(
+                self._df, self.categories
+            )
+            engine.trail = []
 
-    def apply_rules(self):
-        for rule in self.rules:
-            self.df = rule(self.df)
+        failed = []
+        try:
+            for pairing in pairings:
+                self.check_deadline()
+                self._probed.add(pairing)
+                if engine is None:
+                    fails = self._probe_trial(pairing)
+                else:
+                    fails = self._probe_tensor(engine, pairing)
+                if fails:
+                    failed.append(pairing)
+        finally:
+            if engine is not None:
+                engine.trail = None
+
+        def reject(df):
+            for (col, val, othercol, other) in failed:
+                df = rule.is_diff(
+                    common.catval_filter(col, val),
+                    common.catval_filter(othercol, other),
+                    df
+                )
+            return df
+
+        if failed:
+            self._apply(reject, common.PROBE)
+        return len(failed)
+
+    def _probe_tensor(self, engine, pairing):
+        """ whether pairing leads to a contradiction; the engine is left
+            where it started
+
+        """
+        (col, val, othercol, other) = pairing
+        engine.assume(0, engine.value_id(0, col, val), engine.value_id(0, othercol, other))
+        engine.propagate()
+        fails = engine.contradictions()[0]
+        engine.undo()
+        return fails
+
+    def _probe_trial(self, pairing):
+        (col, val, othercol, other) = pairing
+        trial = LogicPuzzle(
+            self.categories, self.rules, maxsolveattempts=None,
+            df=rule.is_same(
+                common.catval_filter(col, val),
+                common.catval_filter(othercol, other),
+                self.df
+            ),
+            keephistory=False, compactthreshold=None
+        )
+        trial._deadline = self._deadline
+        trial.propagate()
+        return not trial.consistent()
+
+    def probe_candidates(self):
+        """ (col, val, othercol, other) for every possible but unsure pairing,
+            values with the fewest possible partners first (those are the
+            probes most likely to fail)
+
+        """
+        poss = self.poss
+        cols = common.category_columns(poss)
+        candidates = []
+        for (i, col) in enumerate(cols):
+            for othercol in cols[i + 1:]:
+                sub = poss[[col, othercol]].drop_duplicates()
+                counts = collections.Counter(sub[col].tolist())
+                for (val, other) in zip(sub[col], sub[othercol]):
+                    if counts[val] > 1:
+                        candidates.append((counts[val], col, val, othercol, other))
+        return [c[1:] for c in sorted(candidates, key=lambda c: c[0])]
 
     def solved(self):
-        return self.df[self.df[common.STATUS] == common.UNSURE].empty
+        return self._view(
+            'solved', lambda: not (self.df[common.STATUS] == common.UNSURE).any()
+        )
+
+    def consistent(self):
+        """ False if some category value has no possible rows left (in which
+            case no amount of solving will get us anywhere)
+
+        """
+        poss = self.poss
+        return all(poss[cat.name].nunique() == len(cat) for cat in self.categories)
+
+    def empty_domains(self):
+        """ (category, value) for every value with no possible rows left """
+        poss = self.poss
+        empty = []
+        for cat in self.categories:
+            left = set(poss[cat.name].unique())
+            empty += [(cat.name, v) for v in cat.values if v not in left]
+        return empty
+
+    def check_consistent(self, source):
+        if not self.consistent():
+            empty = self.empty_domains()
+            msg = "rules contradict each other: no possible rows left for {}".format(
+                ', '.join('{}:{}'.format(c, v) for (c, v) in empty)
+            )
+            raise LogicPuzzleContradiction(msg, source=source, empty=empty)
+
+    def conflict_core(self):
+        """ positions in self.rules of a minimal set of rules that propagate
+            (see propagate) to a contradiction on their own, found by
+            deletion: drop one rule at a time and keep it out if the rest
+            still contradict each other. Like PuzzleGenerator.minimize, the
+            table for the rules we've decided to keep is only ever propagated
+            forward and every trial starts from it.
+
+            None if the rules don't propagate to a contradiction or we run
+            out of time
+
+        """
+        def trial(ruleids, df):
+            t = LogicPuzzle(
+                self.categories, [self.rules[i] for i in ruleids],
+                maxsolveattempts=None, df=df, keephistory=False,
+                probebudget=self.probebudget
+            )
+            t._deadline = self._deadline
+            t.propagate()
+            return t
+
+        try:
+            base = trial([], self.categories.possibilities())
+            pending = range(len(self.rules))
+            if trial(pending, base.df).consistent():
+                return None
+            keep = []
+            while pending:
+                i = pending.pop()
+                if not trial(keep + pending, base.df).consistent():
+                    continue
+                keep.append(i)
+                base = trial(keep, base.df)
+        except LogicPuzzleTimeout:
+            return None
+        return sorted(keep)
+
+    # partial results
+    def partial_solution(self, expired=False):
+        return PartialSolution(
+            confirmed=self.confirmed_pairs(),
+            domains=self.domains(),
+            progress=self.progress(),
+            solved=self.solved(),
+            expired=expired,
+        )
+
+    def confirmed_pairs(self):
+        """ every ((cat1, val1), (cat2, val2)) (cat1 the earlier column)
+            such that all the rows still possible for cat1:val1 have
+            cat2:val2, or the other way around. Values are displayed as in
+            solution; cached like poss
+
+        """
+        return self._view('confirmed_pairs', self._confirmed_pairs)
+
+    def _confirmed_pairs(self):
+        poss = self.poss
+        cols = common.category_columns(poss)
+        pairs = []
+        for (i, col) in enumerate(cols):
+            for othercol in cols[i + 1:]:
+                sub = poss[[col, othercol]].drop_duplicates()
+                counts = collections.Counter(sub[col].tolist())
+                othercounts = collections.Counter(sub[othercol].tolist())
+                for (colval, otherval) in zip(sub[col], sub[othercol]):
+                    if counts[colval] == 1 or othercounts[otherval] == 1:
+                        pairs.append((
+                            (col, self.categories.display_value(col, colval)),
+                            (othercol, self.categories.display_value(othercol, otherval))
+                        ))
+        return pairs
+
+    def domains(self):
+        """ {entity: {category: [possible values]}}, where the entities are
+            the values of the first category; values are displayed as in
+            solution
+
+        """
+        poss = self.poss
+        entcol = self.categories.names[0]
+        othercols = [c for c in common.category_columns(poss) if c != entcol]
+        display = self.categories.display_value
+        return {
+            display(entcol, ent): {
+                col: [display(col, v) for v in sorted(set(g[col]))]
+                for col in othercols
+            }
+            for (ent, g) in poss.groupby(entcol)
+            if not g.empty
+        }
+
+    def progress(self):
+        """ how far we are from the full table (0) to one possible row per
+            entity (1)
+
+        """
+        nrows = self.categories.nrows
+        nents = len(self.categories[0])
+        if nrows == nents:
+            return 1.
+        nposs = self.poss.shape[0]
+        return min(max(float(nrows - nposs) / (nrows - nents), 0.), 1.)
+
+
+# ----------------------------- #
+#   many puzzles                #
+# ----------------------------- #
+
+def interleave(puzzles, **kwargs):
+    """ solve puzzles in one thread, taking turns one step (see
+        LogicPuzzle.iter_solve, which gets kwargs) at a time: yields
+        (position in puzzles, SolveProgress) until every one of them is done.
+        A contradiction in one puzzle is raised and stops the rest
+
+    """
+    running = collections.deque(
+        (i, p.iter_solve(**kwargs)) for (i, p) in enumerate(puzzles)
+    )
+    while running:
+        (i, steps) = running.popleft()
+        try:
+            record = next(steps)
+        except StopIteration:
+            continue
+        running.append((i, steps))
+        yield (i, record)
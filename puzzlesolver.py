@@ -10,16 +10,15 @@ Description:
     solver of logic puzzles
 
 Usage:
-    <usage>
+    python puzzlesolver.py                      # interactive
+    python puzzlesolver.py --serve --socket /tmp/lps.sock
 
 """
 
+import argparse
 import os
 
-import categories
-import puzzle
-import rule
-import rulelist
+import service
 
 
 # ----------------------------- #
@@ -35,6 +34,11 @@ FRULES = os.path.join('config', 'test_rules.txt')
 # ----------------------------- #
 
 def main(numcat, numval):
+    # pandas and the solver are only imported once we know we need them
+    import categories
+    import puzzle
+    import rulelist
+
     c = categories.CategoriesInteractive(numcat, numval)
     r = rulelist.RulesInteractive(c)
     p = puzzle.LogicPuzzle(c, r)
@@ -46,5 +50,53 @@ def main(numcat, numval):
 #   Command line                #
 # ----------------------------- #
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="solver of logic puzzles")
+    parser.add_argument(
+        "--numcat", type=int, default=4,
+        help="number of categories (interactive mode)"
+    )
+    parser.add_argument(
+        "--numval", type=int, default=5,
+        help="number of values per category (interactive mode)"
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="run the long lived solver service instead (see service.py)"
+    )
+    parser.add_argument(
+        "--host", default=service.HOST, help="service host (tcp)"
+    )
+    parser.add_argument(
+        "--port", type=int, default=service.PORT, help="service port (tcp)"
+    )
+    parser.add_argument(
+        "--socket", help="serve on this unix socket path instead of tcp"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="number of solver processes (default: one per cpu)"
+    )
+    parser.add_argument(
+        "--batchsize", type=int, default=service.BATCHSIZE,
+        help="max number of queued requests sent to a worker at once"
+    )
+    parser.add_argument(
+        "--cache", help="sqlite file of solutions to repeated puzzles"
+    )
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    if args.serve:
+        service.serve(
+            host=args.host,
+            port=args.port,
+            socketpath=args.socket,
+            workers=args.workers,
+            batchsize=args.batchsize,
+            cachepath=args.cache,
+        )
+    else:
+        main(args.numcat, args.numval)
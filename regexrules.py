@@ -46,6 +46,7 @@ class RegexRuleFunction(object):
 
     """
     def __init__(self, regex, m2rfunc=None):
+        self.template = regex
         self.regex = regex
         if m2rfunc:
             self.match_to_rule = m2rfunc
@@ -57,10 +58,15 @@ class RegexRuleFunction(object):
             return None
 
     def update_regex(self, **params):
-        self.regex = self.regex.format(**params)
+        # always format from the template so the same object can be re-used
+        # for more than one set of categories
+        self.regex = self.template.format(**params)
+        self._compiled = re.compile(self.regex)
 
     def get_matches(self, line):
-        return re.search(self.regex, line).groups()
+        if getattr(self, '_compiled', None) is None or self._compiled.pattern != self.regex:
+            self._compiled = re.compile(self.regex)
+        return self._compiled.search(line).groups()
 
     def match_to_rule(self, match):
         raise NotImplementedError()
@@ -14,6 +14,7 @@ Usage:
 
 """
 
+import itertools
 import pandas as pd
 import re
 import sys
@@ -45,6 +46,10 @@ def is_only_remaining_pair(df):
     for col in common.category_columns(df2):
         othercols = [c for c in common.category_columns(df2) if c != col]
         for (colval, g) in df2[common.is_possible(df2)].groupby(col):
+            if g.empty:
+                # categorical columns give us a group for every value, even
+                # ones with no possible rows left (a contradiction)
+                continue
             for othercol in othercols:
                 oval0 = g[othercol].iloc[0]
                 if (g[othercol] == oval0).all():
@@ -125,6 +130,20 @@ def is_neither_nor(isfilt, neitherfilt, norfilt, df):
     return df2
 
 
+def is_one_of(isfilt, eitherfilt, orfilt, df):
+    """ reject all rows which are is but not either or: the half of
+        is_either_or that isn't is_diff(either, or)
+
+    """
+    isfilt = common.force_filter(isfilt)
+    eitherfilt = common.force_filter(eitherfilt)
+    orfilt = common.force_filter(orfilt)
+
+    df2 = df.copy()
+    df2.loc[(isfilt(df2) & ~((eitherfilt(df2)) | (orfilt(df2)))), common.STATUS] = common.REJECTED
+    return df2
+
+
 def pair_is_pair(filt11, filt12, filt21, filt22, df):
     """ this is really just four either-or statements """
     df2 = df.copy()
@@ -169,11 +188,12 @@ def is_ordered(compCat, bigfilt, smallfilt, df, offset=0):
     return df2
 
 
-def is_incremented(compCat, bigfilt, smallfilt, df, offset=0):
+def is_incremented(compCat, bigfilt, smallfilt, df, offset=0, wrap=None):
     """ general equation is
         compCat(bigCat:bigElem) = compCat(smallCat:smallElem) + offset
 
-        Same as is_ordered, but eq instead of gt
+        Same as is_ordered, but eq instead of gt. With wrap, the equation is
+        modulo wrap (e.g. 12 for months: december + 2 is february)
 
         if bigfilt or smallfilt are strings instead of lambdas, turn them
         into lambdas with the val_filter function
@@ -194,8 +214,14 @@ def is_incremented(compCat, bigfilt, smallfilt, df, offset=0):
     big = df2[bigfilt(df2)][compCat].unique()
 
     # find impossible values (small values with no corresponding big; vice versa)
-    badsmall = set(small).difference(big - offset)
-    badbig = set(big).difference(small + offset)
+    if wrap:
+        bigrem = set((big - offset) % wrap)
+        smallrem = set((small + offset) % wrap)
+        badsmall = {v for v in small if v % wrap not in bigrem}
+        badbig = {v for v in big if v % wrap not in smallrem}
+    else:
+        badsmall = set(small).difference(big - offset)
+        badbig = set(big).difference(small + offset)
 
     # drop impossible values
     df2.loc[smallfilt(df2) & (df2[compCat].isin(badsmall)), common.STATUS] = common.REJECTED
@@ -14,9 +14,13 @@ Usage:
 
 """
 
+import collections
+import itertools
+import json
 import re
 import yaml
 
+import canonical
 import common
 import rule
 
@@ -31,6 +35,24 @@ class RuleError(Exception):
     pass
 
 
+def value_aliases(categories, cat):
+    """ {text: value} for the values of category cat: just str(value), except
+        in month categories, whose ordinals go by the names of their month
+        (see common.MONTH_NUMBERS; the one and two letter ones and numbers
+        are too easy to find in other words)
+
+    """
+    if cat.name not in getattr(categories, 'months', ()):
+        return {str(v): v for v in cat.values}
+    return {
+        alias: v
+        for v in cat.values
+        for (alias, num) in common.MONTH_NUMBERS.items()
+        if num == v % common.MONTHS_PER_YEAR + 1
+        and isinstance(alias, basestring) and len(alias) > 2
+    }
+
+
 class Rules(list):
     funcmap = {
         1: {'desc': 'A is B', 'func': rule.is_same, 'params': ['filt1', 'filt2']},
@@ -56,11 +78,7 @@ class Rules(list):
                 self.lookup[str(cat.name)] = cat.name
                 if str(cat.name).endswith('s'):
                     self.lookup[str(cat.name)[:-1]] = cat.name
-                self.lookup.update({str(v): v for v in cat.values})
-                # month rev lookup gets builtin
-                if cat.isin(common.MONTHS.values()).any():
-                    for (strs, v) in common.MONTHS.items():
-                        self.lookup.update({s: v for s in strs})
+                self.lookup.update(value_aliases(categories, cat))
         except:
             pass
 
@@ -77,10 +95,16 @@ class RulesFromYaml(Rules):
 
 class RulesFromText(Rules):
     """ the big one -- can we do regex matching on rules? """
-    def __init__(self, rulelines, categories, regexes=STANDARD_RULES):
+    def __init__(self, rulelines, categories, regexes=STANDARD_RULES,
+                 wrapmonths=False):
+        """ with wrapmonths, month offsets go around the end of the year
+            ("two months after november" is january)
+
+        """
         self._rulelines = [rl.lower() for rl in rulelines]
         self._categories = categories
         self._regexes = regexes
+        self._wrapmonths = wrapmonths
         self._update_regexes()
         self.get_rules()
         self.smart_lookup_ify()
@@ -99,6 +123,14 @@ class RulesFromText(Rules):
         L = len(self._regexes)
         raise RuleError("No match found among our {} regexes".format(L))
 
+    def parse(self, ruleline):
+        """ parse one more line into a Rule whose params have already been
+            replaced by their lookup values. The rule is *not* added to this
+            list; useful for checking lines generated elsewhere
+
+        """
+        return self.lookup_params(self.try_all_regexes(ruleline.lower()))
+
     def smart_lookup_ify(self):
         """ for all the rules we have now collected, we should have params.
             The values in those params should be replaced, if possible, with
@@ -106,16 +138,29 @@ class RulesFromText(Rules):
 
         """
         self.make_lookup(self._categories)
-        for rule in self:
-            rule.params = {
-                k: self.lookup.get(v, v) for (k, v) in rule.params.items()
-            }
+        for r in self:
+            self.lookup_params(r)
+
+    def lookup_params(self, r):
+        r.params = {k: self.lookup.get(v, v) for (k, v) in r.params.items()}
+        if self._wrapmonths and r.f is rule.is_incremented:
+            try:
+                compcat = self._categories.comparison_category(r.params['compCat'])
+            except Exception:
+                compcat = None
+            if compcat in getattr(self._categories, 'months', ()):
+                r.params['wrap'] = common.MONTHS_PER_YEAR
+        return r
 
     # properties; mostly for formatting regex strings
     @property
     @common.memoized
     def vals(self):
-        return {str(v): cat.name for cat in self._categories for v in cat.values}
+        return {
+            s: cat.name
+            for cat in self._categories
+            for s in value_aliases(self._categories, cat)
+        }
 
     @property
     @common.memoized
@@ -180,12 +225,14 @@ class RulesFromText(Rules):
 
 
 class RulesFromFile(RulesFromText):
-    def __init__(self, fname, categories, regexes=STANDARD_RULES):
+    def __init__(self, fname, categories, regexes=STANDARD_RULES,
+                 wrapmonths=False):
         self.fname = fname
         with open(self.fname, 'rb') as f:
             lines = [line.strip() for line in f.readlines()]
         super(RulesFromFile, self).__init__(
-            rulelines=lines, categories=categories, regexes=regexes
+            rulelines=lines, categories=categories, regexes=regexes,
+            wrapmonths=wrapmonths
         )
 
 
@@ -281,6 +328,202 @@ class RulesInteractive(Rules):
         elif valtype == 'float':
             vals = map(float, vals)
         elif valtype == 'month':
-            vals = map(common.monthify, vals)
+            vals = map(common.month_ordinal, vals)
 
         return vals
+
+
+# ----------------------------- #
+#   compiled rules              #
+# ----------------------------- #
+
+class CompiledRules(Rules):
+    """ an equivalent but cheaper version of a list of rules (every rule is
+        a full pass over the table on every sweep):
+            1. composite rules are lowered into primitive ones: pair_is_pair
+               and is_either_or into is_diff and is_one_of, is_neither_nor
+               into a similarity group
+            2. the parameters of symmetric rules are put in canonical order
+               (see canonical.py) and duplicates dropped
+            3. rules implied by others are dropped: is_diff(a, b) when a and
+               b are in the same category, or another rule already keeps
+               them apart; similarity groups inside bigger ones; and
+               is_ordered next to a stronger is_ordered or is_incremented of
+               the same pair
+            4. an is_diff(either, or) left over from 1. and an is_one_of(is,
+               either, or) are put back together into one is_either_or
+
+        A dropped rule only ever rejects rows the rule implying it rejects as
+        well, so solving ends up in the same place.
+
+        sources[i] are the positions in rules that compiled rule i was
+        lowered from, and removed counts the dropped rules by reason
+
+    """
+    def __init__(self, rules, categories=None):
+        self.original = list(rules)
+        self.categories = categories
+        self.sources = []
+        self.removed = collections.Counter()
+        self.compile()
+
+    def compile(self):
+        # lower and canonicalize, keeping the first of any duplicates
+        primitives = collections.OrderedDict()
+        for (i, r) in enumerate(self.original):
+            for p in self.lower(r):
+                p = self.canonical_order(p)
+                try:
+                    key = canonical.rule_key(p, self.categories)
+                except canonical.CanonicalError:
+                    key = id(p)
+                if key in primitives:
+                    primitives[key][1].add(i)
+                    self.removed['duplicate'] += 1
+                else:
+                    primitives[key] = (p, {i})
+
+        primitives = primitives.values()
+        kept = []
+        for (j, (r, sources)) in enumerate(primitives):
+            if self.trivial(r):
+                self.removed['trivial'] += 1
+            elif any(self.implies(other, r) for (k, (other, _)) in enumerate(primitives) if k != j):
+                self.removed['implied'] += 1
+            else:
+                kept.append((r, sources))
+
+        # put is_diff(either, or) back together with an is_one_of(is, either,
+        # or): is_either_or does both in one rule
+        diffs = {
+            self.pair(r, 'filt1', 'filt2'): j
+            for (j, (r, sources)) in enumerate(kept) if r.f is rule.is_diff
+        }
+        merged = set()
+        for (j, (r, sources)) in enumerate(kept):
+            if r.f is rule.is_one_of:
+                d = diffs.pop(self.pair(r, 'eitherfilt', 'orfilt'), None)
+                if d is not None:
+                    kept[j] = (rule.Rule(rule.is_either_or, **r.params), sources | kept[d][1])
+                    merged.add(d)
+        self.removed['merged'] = len(merged)
+
+        for (j, (r, sources)) in enumerate(kept):
+            if j not in merged:
+                self.append(r)
+                self.sources.append(sorted(sources))
+
+    def summary(self):
+        msg = '{} rules compiled to {} ({} duplicate, {} implied, {} trivial, {} merged)'
+        return msg.format(
+            len(self.original), len(self), self.removed['duplicate'],
+            self.removed['implied'], self.removed['trivial'], self.removed['merged']
+        )
+
+    # lowering
+    def lower(self, r):
+        name = r.f.__name__
+        p = r.params
+        if name == 'pair_is_pair':
+            (a1, a2, b1, b2) = (p['filt11'], p['filt12'], p['filt21'], p['filt22'])
+            return [
+                rule.Rule(rule.is_diff, filt1=a1, filt2=a2),
+                rule.Rule(rule.is_diff, filt1=b1, filt2=b2),
+                rule.Rule(rule.is_one_of, isfilt=a1, eitherfilt=b1, orfilt=b2),
+                rule.Rule(rule.is_one_of, isfilt=a2, eitherfilt=b1, orfilt=b2),
+                rule.Rule(rule.is_one_of, isfilt=b1, eitherfilt=a1, orfilt=a2),
+                rule.Rule(rule.is_one_of, isfilt=b2, eitherfilt=a1, orfilt=a2),
+            ]
+        if name == 'is_either_or':
+            return [
+                rule.Rule(rule.is_diff, filt1=p['eitherfilt'], filt2=p['orfilt']),
+                rule.Rule(
+                    rule.is_one_of, isfilt=p['isfilt'],
+                    eitherfilt=p['eitherfilt'], orfilt=p['orfilt']
+                ),
+            ]
+        if name == 'is_neither_nor':
+            # is, neither, and nor are all different
+            return [rule.Rule(
+                rule.similarity_group_updates,
+                filtlist=[p['isfilt'], p['neitherfilt'], p['norfilt']]
+            )]
+        return [r]
+
+    def canonical_order(self, r):
+        params = dict(r.params)
+        try:
+            for group in canonical.SYMMETRIC.get(r.f.__name__, []):
+                vals = sorted((params[k] for k in group), key=canonical.param_key)
+                params.update(zip(group, vals))
+            if 'filtlist' in params:
+                params['filtlist'] = sorted(params['filtlist'], key=canonical.param_key)
+        except canonical.CanonicalError:
+            return r
+        return rule.Rule(r.f, **params)
+
+    # implication
+    def trivial(self, r):
+        """ is_diff of two values of one category (no row has both anyway) """
+        if r.f is not rule.is_diff or self.categories is None:
+            return False
+        try:
+            ((c1, j1), (c2, j2)) = [
+                self.categories.locate(r.params[k]) for k in ('filt1', 'filt2')
+            ]
+        except Exception:
+            return False
+        return c1 == c2 and j1 != j2
+
+    def implies(self, a, b):
+        """ does rule a reject every row rule b would """
+        if b.f is rule.is_diff:
+            return self.pair(b, 'filt1', 'filt2') in self.kept_apart(a)
+        if b.f is rule.similarity_group_updates:
+            return (
+                a.f is rule.similarity_group_updates
+                and self.group(b) < self.group(a)
+            )
+        if b.f is rule.is_ordered:
+            return (
+                (a.f is rule.is_ordered or (a.f is rule.is_incremented and not a.params.get('wrap')))
+                and self.comparison(a) == self.comparison(b)
+                and a.params.get('offset', 0) > b.params.get('offset', 0)
+            )
+        return False
+
+    def kept_apart(self, r):
+        """ pairs of values r never lets share a row """
+        if r.f is rule.similarity_group_updates:
+            return set(frozenset(pair) for pair in itertools.combinations(self.group(r), 2))
+        if r.f in (rule.is_ordered, rule.is_incremented):
+            return {self.pair(r, 'bigfilt', 'smallfilt')}
+        return set()
+
+    def pair(self, r, k1, k2):
+        return frozenset([_param_id(r.params[k1]), _param_id(r.params[k2])])
+
+    def group(self, r):
+        return frozenset(_param_id(v) for v in r.params['filtlist'])
+
+    def comparison(self, r):
+        compcat = r.params['compCat']
+        if self.categories is not None:
+            try:
+                compcat = self.categories.comparison_category(compcat)
+            except Exception:
+                pass
+        return (
+            compcat, _param_id(r.params['bigfilt']), _param_id(r.params['smallfilt'])
+        )
+
+
+def _param_id(v):
+    """ hashable stand in for a rule parameter, equal for equal values (and
+        for filters, only for the same filter)
+
+    """
+    try:
+        return json.dumps(canonical.param_key(v))
+    except canonical.CanonicalError:
+        return id(v)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: service.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    long running solver service. Starting a python process (and importing
+    pandas) per puzzle costs far more than solving a small puzzle, so instead
+    we keep a pool of pre-forked, pre-warmed worker processes around and feed
+    them puzzles that arrive over a local tcp or unix socket.
+
+    The protocol is one json object per line in each direction:
+        {"categories": {...}, "rules": ["line", ...], "timebudget": 1.5}
+            categories look like the contents of a categories yaml file;
+            timebudget is optional (see LogicPuzzle.solve)
+        {"puzzles": [{...}, {...}]}
+            several of the above at once; answered with {"results": [...]}
+        {"stats": true}
+            queue depth, in flight count, and latency histogram
+    Rules that contradict each other come back as an error along with the
+    "core": the smallest set of rule lines we could find that clash.
+
+    With a cache path, every worker answers repeated puzzles from a shared
+    SolutionCache (see cache.py) and says so with "cached": true
+
+    Requests wait in a single queue. One dispatcher thread per worker takes
+    whatever is waiting (up to batchsize requests) and sends it to the pool
+    as a single task, so a burst of small puzzles costs one round trip per
+    batch instead of one per puzzle
+
+Usage:
+    python puzzlesolver.py --serve --socket /tmp/lps.sock
+    python puzzlesolver.py --serve --port 8577 --workers 4
+    python puzzlesolver.py --serve --cache /var/tmp/lps.db
+
+"""
+
+import json
+import multiprocessing
+import os
+import Queue
+import SocketServer
+import threading
+import time
+
+import common
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+HOST = '127.0.0.1'
+PORT = 8577
+BATCHSIZE = 8
+
+# upper edges (seconds) of the latency histogram buckets; anything slower
+# goes in one last open-ended bucket
+LATENCY_BUCKETS = [.001, .005, .01, .05, .1, .5, 1, 5, 10, 60]
+
+WARMUP = {
+    'categories': {
+        'a': {'values': ['x', 'y']},
+        'b': {'values': [1, 2], 'type': 'int'},
+    },
+    'rules': ['x was 1.'],
+}
+
+
+# ----------------------------- #
+#   worker side                 #
+# ----------------------------- #
+
+def preload():
+    """ import the solver (and with it pandas). The front end never solves
+        anything itself, so it only does this right before forking the
+        workers, which then start out with everything imported
+
+    """
+    import cache
+    import categories
+    import puzzle
+    import rulelist
+    return (cache, categories, puzzle, rulelist)
+
+
+# per worker process state, set up by warm
+_WORKER = {}
+
+
+def warm(cachepath=None):
+    """ pool initializer; the imports are already done (we fork after them),
+        so solve one tiny puzzle to get pandas' lazy imports and our regex
+        setup out of the way before the first real request shows up
+
+    """
+    (cache, categories, puzzle, rulelist) = preload()
+    if cachepath:
+        _WORKER['cache'] = cache.SolutionCache(cachepath)
+    solve_request(WARMUP)
+
+
+def solve_request(request):
+    """ solve one puzzle request, returning a json-able dict. This runs in
+        the worker processes, so anything that goes wrong is reported back
+        rather than raised
+
+    """
+    t0 = time.time()
+    (cache, categories, puzzle, rulelist) = preload()
+    try:
+        c = categories.CategoriesFromDict(request['categories'])
+        r = rulelist.RulesFromText(request['rules'], c)
+        p = puzzle.LogicPuzzle(
+            c, r,
+            maxsolveattempts=request.get('maxsolveattempts', 10),
+            keephistory=False
+        )
+        solutioncache = _WORKER.get('cache')
+        if solutioncache is None:
+            partial = p.solve(timebudget=request.get('timebudget'))
+            cached = False
+        else:
+            hits = solutioncache.hits
+            partial = solutioncache.solve(p, timebudget=request.get('timebudget'))
+            cached = solutioncache.hits > hits
+        return {
+            'cached': cached,
+            'solved': partial.solved,
+            'expired': partial.expired,
+            'progress': partial.progress,
+            'solution': records(p.solution),
+            'confirmed': [
+                [[c1, jsonable(v1)], [c2, jsonable(v2)]]
+                for ((c1, v1), (c2, v2)) in partial.confirmed
+            ],
+            'elapsed': time.time() - t0,
+        }
+    except puzzle.LogicPuzzleContradiction as e:
+        return {
+            'error': '{}: {}'.format(type(e).__name__, e),
+            'core': [request['rules'][i] for i in e.core or []],
+            'elapsed': time.time() - t0,
+        }
+    except Exception as e:
+        return {
+            'error': '{}: {}'.format(type(e).__name__, e),
+            'elapsed': time.time() - t0,
+        }
+
+
+def records(df):
+    cols = common.category_columns(df)
+    return [
+        {col: jsonable(v) for (col, v) in zip(cols, row)}
+        for row in zip(*[df[col].tolist() for col in cols])
+    ]
+
+
+def jsonable(v):
+    if hasattr(v, 'item'):
+        return v.item()
+    if common.is_month(v):
+        return str(v)
+    return v
+
+
+# ----------------------------- #
+#   dispatching                 #
+# ----------------------------- #
+
+class ServiceError(Exception):
+    pass
+
+
+class Job(object):
+    def __init__(self, request):
+        self.request = request
+        self.result = None
+        self.submitted = time.time()
+        self._done = threading.Event()
+
+    def finish(self, result):
+        self.result = result
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        return self.result
+
+
+class ServiceStats(object):
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.inflight = 0
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    def started(self, jobs):
+        with self._lock:
+            self.batches += 1
+            self.inflight += len(jobs)
+
+    def finished(self, jobs, results):
+        now = time.time()
+        with self._lock:
+            self.inflight -= len(jobs)
+            for (job, result) in zip(jobs, results):
+                self.requests += 1
+                if 'error' in result:
+                    self.errors += 1
+                elapsed = now - job.submitted
+                i = 0
+                while i < len(LATENCY_BUCKETS) and elapsed > LATENCY_BUCKETS[i]:
+                    i += 1
+                self.latency[i] += 1
+
+    def report(self, queued):
+        with self._lock:
+            return {
+                'queued': queued,
+                'inflight': self.inflight,
+                'requests': self.requests,
+                'errors': self.errors,
+                'batches': self.batches,
+                'latency': [
+                    {'le': le, 'count': n}
+                    for (le, n) in zip(LATENCY_BUCKETS + [None], self.latency)
+                ],
+            }
+
+
+class SolverPool(object):
+    def __init__(self, workers=None, batchsize=BATCHSIZE, cachepath=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.batchsize = batchsize
+        self.stats = ServiceStats()
+        preload()
+        self.pool = multiprocessing.Pool(
+            self.workers, initializer=warm, initargs=(cachepath,)
+        )
+        self._jobs = Queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._dispatch)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.daemon = True
+            t.start()
+
+    def handle(self, request):
+        """ answer one decoded request (see module docstring) """
+        if not isinstance(request, dict):
+            return {'error': 'bad request: expected a json object'}
+        if request.get('stats'):
+            return self.stats.report(queued=self._jobs.qsize())
+        if 'puzzles' in request:
+            if not isinstance(request['puzzles'], list):
+                return {'error': 'bad request: puzzles must be a list'}
+            jobs = [self.submit(p) for p in request['puzzles']]
+            return {'results': [job.wait() for job in jobs]}
+        return self.submit(request).wait()
+
+    def submit(self, request):
+        job = Job(request)
+        self._jobs.put(job)
+        return job
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def _dispatch(self):
+        while True:
+            jobs = [self._jobs.get()]
+            while len(jobs) < self.batchsize:
+                try:
+                    jobs.append(self._jobs.get_nowait())
+                except Queue.Empty:
+                    break
+
+            self.stats.started(jobs)
+            try:
+                results = self.pool.map(
+                    solve_request,
+                    [job.request for job in jobs],
+                    chunksize=len(jobs)
+                )
+            except Exception as e:
+                results = [{'error': '{}: {}'.format(type(e).__name__, e)}] * len(jobs)
+            # count the jobs as done before anyone waiting on them hears so
+            self.stats.finished(jobs, results)
+            for (job, result) in zip(jobs, results):
+                job.finish(result)
+
+
+# ----------------------------- #
+#   socket servers              #
+# ----------------------------- #
+
+class SolverHandler(SocketServer.StreamRequestHandler):
+    def handle(self):
+        for line in iter(self.rfile.readline, ''):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {'error': 'bad json: {}'.format(e)}
+            else:
+                response = self.server.solverpool.handle(request)
+            self.wfile.write(json.dumps(response) + '\n')
+            self.wfile.flush()
+
+
+class TCPSolverServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class UnixSolverServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(solverpool, host=HOST, port=PORT, socketpath=None):
+    if socketpath:
+        if os.path.exists(socketpath):
+            raise ServiceError("socket {} already exists".format(socketpath))
+        server = UnixSolverServer(socketpath, SolverHandler)
+    else:
+        server = TCPSolverServer((host, port), SolverHandler)
+    server.solverpool = solverpool
+    return server
+
+
+def serve(host=HOST, port=PORT, socketpath=None, workers=None,
+          batchsize=BATCHSIZE, cachepath=None):
+    solverpool = SolverPool(
+        workers=workers, batchsize=batchsize, cachepath=cachepath
+    )
+    server = make_server(solverpool, host=host, port=port, socketpath=socketpath)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        solverpool.close()
+        if socketpath and os.path.exists(socketpath):
+            os.remove(socketpath)
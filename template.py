@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: template.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    compiled puzzle templates: everything about a puzzle that only depends
+    on its categories, built once and then shared by any number of solves of
+    different rule sets (clue minimization, parser A/B tests, ...).
+
+    A template holds
+        - the possibility table (and its encoded form, see encoded.py)
+        - the row mask of every category value, so that the rule filters
+          are one array lookup instead of a DataFrame.isin scan
+        - a rule parser with its regexes formatted (and compiled) and its
+          lookup built for these categories
+
+    None of it is modified after __init__ (rules always hand back new
+    tables), so one template can be used from several threads at once;
+    every solve gets its own LogicPuzzle, which only ever holds references
+    to the template's table
+
+Usage:
+    t = PuzzleTemplate(categories)
+    p = t.puzzle(lines=['hugh wore number 28.', ...])
+    p = t.puzzle(rules=some_rules)
+    p.solve()
+
+"""
+
+import copy
+import threading
+
+import canonical
+import common
+import encoded
+import puzzle
+import rule
+import rulelist
+
+from regexrules import STANDARD_RULES
+
+
+# ----------------------------- #
+#   filters                     #
+# ----------------------------- #
+
+class MaskFilter(object):
+    """ drop in replacement for common.val_filter(value) that reads the
+        value's precomputed row mask instead of scanning the table
+
+    """
+    def __init__(self, value, mask):
+        self.value = value
+        self.mask = mask
+
+    def __call__(self, df):
+        return common.is_possible(df) & self.mask[df.index.values]
+
+    def __reduce__(self):
+        # pickle as the plain value (which rules turn into a val_filter), so
+        # e.g. a checkpoint doesn't carry a copy of the mask per filter
+        return (_plain, (self.value,))
+
+
+def _plain(value):
+    return value
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class TemplateError(Exception):
+    pass
+
+
+class PuzzleTemplate(object):
+    def __init__(self, categories, regexes=STANDARD_RULES):
+        self.categories = categories
+        self.table = categories.possibilities()
+        (self.index, self.codes, status) = encoded.encode(self.table, categories)
+        self.codes.flags.writeable = False
+
+        # value -> mask of the rows that have it in any column (the same
+        # lax matching val_filter does)
+        self.masks = {}
+        for (i, cat) in enumerate(categories):
+            for (j, v) in enumerate(cat.values):
+                mask = self.codes[:, i] == j
+                if v in self.masks:
+                    mask = mask | self.masks[v]
+                mask.flags.writeable = False
+                self.masks[v] = mask
+
+        self._parser = rulelist.RulesFromText(
+            rulelines=[],
+            categories=categories,
+            regexes=[copy.copy(regex) for regex in regexes]
+        )
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def parse(self, lines):
+        """ Rules for rule lines, parsed against these categories """
+        return [self._parser.parse(line) for line in lines]
+
+    def filter(self, value):
+        try:
+            return MaskFilter(value, self.masks[value])
+        except (KeyError, TypeError):
+            raise TemplateError("{!r} is not a value of any category".format(value))
+
+    def compile(self, rules):
+        """ copies of rules whose value filters use the template masks.
+            Rules are compiled once per template and then shared by every rule
+            with the same canonical form (see canonical.rule_key), so parsing
+            the same lines again doesn't add to the cache; rules without one
+            (hand written filters) are compiled every time
+
+        """
+        compiled = []
+        for r in rules:
+            try:
+                key = canonical.rule_key(r, self.categories)
+            except canonical.CanonicalError:
+                compiled.append(self._compile_rule(r))
+                continue
+            with self._lock:
+                c = self._compiled.get(key)
+            if c is None:
+                c = self._compile_rule(r)
+                with self._lock:
+                    c = self._compiled.setdefault(key, c)
+            compiled.append(c)
+        return compiled
+
+    def puzzle(self, rules=None, lines=None, **kwargs):
+        """ a new LogicPuzzle over the template table for rules and / or
+            rule lines; kwargs go to LogicPuzzle
+
+        """
+        rules = list(rules or []) + self.parse(lines or [])
+        kwargs.setdefault('keephistory', False)
+        return puzzle.LogicPuzzle(
+            self.categories, self.compile(rules), df=self.table, **kwargs
+        )
+
+    def _compile_rule(self, r):
+        params = {}
+        for (k, v) in r.params.items():
+            if k == 'filtlist':
+                v = [self._compile_filter(f) for f in v]
+            elif k.endswith('filt') or k.startswith('filt'):
+                v = self._compile_filter(v)
+            params[k] = v
+        return rule.Rule(r.f, **params)
+
+    def _compile_filter(self, f):
+        # anything that isn't a plain value (e.g. a hand written lambda) is
+        # left alone
+        if callable(f):
+            return f
+        return self.filter(f)
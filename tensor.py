@@ -0,0 +1,546 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: tensor.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    batched solving of many puzzles of the same shape (same number of
+    categories, same number of values in each) with numpy.
+
+    Puzzles of one shape share their possibility table: row r of
+    Categories.possibilities() has the same value *positions* (see
+    encoded.py) whatever the values are. So a batch of B puzzles is two
+    (B, rows) boolean arrays, possible and confirmed, on top of one shared
+    table of codes, and each rule type is a kernel that takes index arrays
+    covering every rule of that type in every puzzle of the batch. A sweep
+    costs one numpy call per rule *type* instead of one DataFrame pass per
+    rule per puzzle.
+
+    The kernels do what their rule.py namesakes (and clean_up) do, on whole
+    rows, so we land on the same fixed point LogicPuzzle.propagate does. The
+    per category pair grids, shape (B, n, n), are there too (pair_grid)
+
+Usage:
+    e = TensorEngine([(categories1, rules1), (categories2, rules2), ...])
+    solutions = e.solve()   # per puzzle: rows in category order, or None
+
+    # one puzzle per subset of the rules, compiled once
+    s = TensorEngine([(categories, rules)]).subsets([[True, False, ...], ...])
+
+"""
+
+import copy
+import itertools
+
+import numpy as np
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+# rule kernels, in the order a sweep runs them
+KERNELS = ['same', 'diff', 'either', 'neither', 'oneof', 'ordered', 'incremented']
+
+# the rules there are kernels for
+RULES = [
+    'is_same', 'is_diff', 'is_either_or', 'is_one_of', 'is_neither_nor',
+    'pair_is_pair', 'similarity_group_updates', 'is_ordered', 'is_incremented',
+]
+
+# which rows of each kernel's ops are value ids
+VALUE_OPS = {
+    'same': slice(1, 3), 'diff': slice(1, 3), 'either': slice(1, 4),
+    'neither': slice(1, 4), 'oneof': slice(1, 4), 'ordered': slice(2, 4),
+    'incremented': slice(2, 4),
+}
+
+
+# ----------------------------- #
+#   Main class                  #
+# ----------------------------- #
+
+class TensorError(Exception):
+    pass
+
+
+class TensorEngine(object):
+    def __init__(self, puzzles):
+        """ puzzles is a list of (categories, rules) pairs; every categories
+            must have the same number of categories and of values in each
+
+        """
+        self.puzzles = puzzles
+        shapes = set(tuple(len(cat) for cat in c) for (c, r) in puzzles)
+        if len(shapes) != 1:
+            raise TensorError("puzzles don't all have the same shape")
+        (self.shape,) = shapes
+
+        self.B = len(puzzles)
+        self.k = len(self.shape)
+        # global id of value j of category c is self.starts[c] + j
+        self.starts = np.cumsum([0] + list(self.shape[:-1]))
+        self.N = sum(self.shape)
+
+        # the shared table: codes[r, c] is the position of row r's value in
+        # category c, and masks[u] the rows holding value u
+        self.codes = np.array(
+            list(itertools.product(*[range(n) for n in self.shape])),
+            dtype=np.int64
+        ).reshape(-1, self.k)
+        self.R = self.codes.shape[0]
+        self.masks = np.zeros((self.N, self.R), dtype=bool)
+        for c in range(self.k):
+            for j in range(self.shape[c]):
+                self.masks[self.starts[c] + j] = self.codes[:, c] == j
+        # as floats, for counting rows with matrix products
+        self._fmasks = self.masks.astype(np.float32)
+        self._fnotmasks = (~self.masks).astype(np.float32)
+
+        self.possible = np.ones((self.B, self.R), dtype=bool)
+        self.confirmed = np.zeros((self.B, self.R), dtype=bool)
+        # with a list here, every entry of possible / confirmed the kernels
+        # and clean_up flip goes on it (see undo)
+        self.trail = None
+        self.numeric = np.full((self.B, self.k, max(self.shape)), np.nan)
+        self._compile()
+
+    # setup
+    def _compile(self):
+        ops = {kind: [] for kind in KERNELS}
+        # position of the rule (in its puzzle) every op came from
+        rulepos = {kind: [] for kind in KERNELS}
+        for (b, (categories, rules)) in enumerate(self.puzzles):
+            for (c, cat) in enumerate(categories):
+                for (j, v) in enumerate(cat.values):
+                    self.numeric[b, c, j] = _number(v)
+            self._compile_rules(b, categories, rules, 0, ops, rulepos)
+        (self._ops, self._rulepos) = self._arrays(ops, rulepos)
+
+    def _compile_rules(self, b, categories, rules, first, ops, rulepos):
+        """ add the ops for rules (positions first, first + 1, ... in puzzle
+            b) to the lists in ops and rulepos
+
+        """
+        # global id of every category value (values that aren't in exactly
+        # one category are left to locate to complain about)
+        located = {}
+        for (c, cat) in enumerate(categories):
+            for (j, v) in enumerate(cat.values):
+                located[v] = None if v in located else self.starts[c] + j
+
+        def gid(v):
+            u = located.get(v)
+            if u is None:
+                (c, j) = categories.locate(v)
+                u = self.starts[c] + j
+            return u
+
+        for (i, r) in enumerate(rules, first):
+            name = r.f.__name__
+            if not supported(r):
+                raise TensorError("no kernel for rule {} (or its filters)".format(name))
+            p = {k: _value(v) for (k, v) in r.params.items()}
+            nops = {kind: len(ops[kind]) for kind in KERNELS}
+
+            if name == 'is_same':
+                ops['same'].append((b, gid(p['filt1']), gid(p['filt2'])))
+            elif name == 'is_diff':
+                ops['diff'].append((b, gid(p['filt1']), gid(p['filt2'])))
+            elif name == 'is_either_or':
+                ops['either'].append(
+                    (b, gid(p['isfilt']), gid(p['eitherfilt']), gid(p['orfilt']))
+                )
+            elif name == 'is_one_of':
+                ops['oneof'].append(
+                    (b, gid(p['isfilt']), gid(p['eitherfilt']), gid(p['orfilt']))
+                )
+            elif name == 'is_neither_nor':
+                ops['neither'].append(
+                    (b, gid(p['isfilt']), gid(p['neitherfilt']), gid(p['norfilt']))
+                )
+            elif name == 'pair_is_pair':
+                (a1, a2, b1, b2) = map(gid, [p['filt11'], p['filt12'], p['filt21'], p['filt22']])
+                ops['either'] += [
+                    (b, a1, b1, b2), (b, a2, b1, b2),
+                    (b, b1, a1, a2), (b, b2, a1, a2),
+                ]
+            elif name == 'similarity_group_updates':
+                ids = map(gid, p['filtlist'])
+                ops['diff'] += [
+                    (b, u, v) for (m, u) in enumerate(ids) for v in ids[m + 1:]
+                ]
+            elif name in ('is_ordered', 'is_incremented'):
+                c = categories.names.index(
+                    categories.comparison_category(p['compCat'])
+                )
+                ops[name[3:]].append((
+                    b, c, gid(p['bigfilt']), gid(p['smallfilt']),
+                    p.get('offset', 0), p.get('wrap') or 0
+                ))
+            for kind in KERNELS:
+                rulepos[kind] += [i] * (len(ops[kind]) - nops[kind])
+
+    def _arrays(self, ops, rulepos):
+        """ the op lists as one (fields, instances) array per kernel, and
+            the rule positions to go with them
+
+        """
+        width = {
+            'same': 3, 'diff': 3, 'either': 4, 'neither': 4, 'oneof': 4,
+            'ordered': 6, 'incremented': 6
+        }
+        return (
+            {
+                kind: np.array(rows, dtype=np.int64).reshape(-1, width[kind]).T
+                for (kind, rows) in ops.items()
+            },
+            {
+                kind: np.array(pos, dtype=np.int64)
+                for (kind, pos) in rulepos.items()
+            },
+        )
+
+    def extend(self, rules):
+        """ add rules to this engine's single puzzle. Only they are
+            compiled, and the state is kept, so propagate carries on from
+            where the puzzle is now
+
+        """
+        if self.B != 1:
+            raise TensorError("extending a batch of {} puzzles".format(self.B))
+        (categories, old) = self.puzzles[0]
+        ops = {kind: [] for kind in KERNELS}
+        rulepos = {kind: [] for kind in KERNELS}
+        self._compile_rules(0, categories, rules, len(old), ops, rulepos)
+        (ops, rulepos) = self._arrays(ops, rulepos)
+        for kind in KERNELS:
+            self._ops[kind] = np.hstack([self._ops[kind], ops[kind]])
+            self._rulepos[kind] = np.r_[self._rulepos[kind], rulepos[kind]]
+        self.puzzles = [(categories, list(old) + list(rules))]
+
+    def subsets(self, active):
+        """ a new engine with one puzzle per row of active (a bool per rule
+            of this engine's single puzzle), which runs just the rules it
+            marks, starting from this puzzle's state. The table and the
+            compiled rules are shared rather than built again, and rule
+            positions are still positions in the full rule list
+
+        """
+        if self.B != 1:
+            raise TensorError("subsets of a batch of {} puzzles".format(self.B))
+        active = np.asarray(active, dtype=bool).reshape(-1, len(self.puzzles[0][1]))
+        e = copy.copy(self)
+        e.B = active.shape[0]
+        e.puzzles = self.puzzles * e.B
+        e.possible = np.repeat(self.possible, e.B, axis=0)
+        e.confirmed = np.repeat(self.confirmed, e.B, axis=0)
+        e.trail = None
+        e.numeric = np.repeat(self.numeric, e.B, axis=0)
+        (e._ops, e._rulepos) = ({}, {})
+        for kind in KERNELS:
+            (b, which) = np.nonzero(active[:, self._rulepos[kind]])
+            e._ops[kind] = self._ops[kind][:, which]
+            e._ops[kind][0] = b
+            e._rulepos[kind] = self._rulepos[kind][which]
+        return e
+
+    def value_id(self, b, name, v):
+        """ global id of value v of category name, in puzzle b """
+        categories = self.puzzles[b][0]
+        c = categories.names.index(name)
+        return self.starts[c] + list(categories[c].values).index(v)
+
+    # kernels; b and the value ids are arrays with one entry per rule
+    # instance, and each kernel returns an (instances, rows) array of the
+    # rows to reject
+    def _reject(self, b, rows):
+        """ reject rows[i] in puzzle b[i]; a puzzle can appear more than
+            once. Returns whether any of them were still possible
+
+        """
+        if not b.size:
+            return False
+        order = np.argsort(b, kind='mergesort')
+        b = b[order]
+        first = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+        rejected = np.logical_or.reduceat(rows[order], first, axis=0)
+        return self._flip('possible', b[first], rejected & self.possible[b[first]])
+
+    def _flip(self, name, b, rows):
+        """ flip entries rows[i] of puzzle b[i] in self.possible (to False)
+            or self.confirmed (to True), and put them on the trail. rows
+            must be entries that aren't there yet; returns whether there
+            were any
+
+        """
+        (i, j) = np.nonzero(rows)
+        if not i.size:
+            return False
+        flat = b[i] * self.R + j
+        getattr(self, name).flat[flat] = name == 'confirmed'
+        if self.trail is not None:
+            self.trail.append((name, flat))
+        return True
+
+    def _same(self, b, u, v):
+        return self.masks[u] ^ self.masks[v]
+
+    def _diff(self, b, u, v):
+        return self.masks[u] & self.masks[v]
+
+    def _either(self, b, x, y, z):
+        # is_diff(either, or), then no x without either or or
+        (mx, my, mz) = (self.masks[x], self.masks[y], self.masks[z])
+        return (my & mz) | (mx & ~(my | mz))
+
+    def _oneof(self, b, x, y, z):
+        (mx, my, mz) = (self.masks[x], self.masks[y], self.masks[z])
+        return mx & ~(my | mz)
+
+    def _neither(self, b, x, y, z):
+        (mx, my, mz) = (self.masks[x], self.masks[y], self.masks[z])
+        return (my & mz) | (mx & (my | mz))
+
+    def _compare(self, b, c, big, small):
+        """ what is_ordered and is_incremented share: after is_diff, the
+            rows still possible, which of them have big / small, and the
+            position of every row's compCat value
+
+        """
+        (mbig, msmall) = (self.masks[big], self.masks[small])
+        diff = mbig & msmall
+        live = self.possible[b] & ~diff
+        positions = self.codes.T[c]
+        return (diff, live & mbig, live & msmall, positions)
+
+    def _ordered(self, b, c, big, small, offset, wrap):
+        (diff, bigrows, smallrows, positions) = self._compare(b, c, big, small)
+        vals = self.numeric[b[:, None], c[:, None], positions]
+        off = offset[:, None].astype(float)
+
+        # big > the smallest small (+ offset); no small rows, no rejections
+        minsmall = np.where(smallrows, vals, np.inf).min(axis=1)[:, None]
+        minsmall[~smallrows.any(axis=1)] = -np.inf
+        bigrej = bigrows & (vals <= minsmall + off)
+
+        # small < the largest big left after that (- offset)
+        bigrows = bigrows & ~bigrej
+        maxbig = np.where(bigrows, vals, -np.inf).max(axis=1)[:, None]
+        maxbig[~bigrows.any(axis=1)] = np.inf
+        smallrej = smallrows & (vals >= maxbig - off)
+
+        return diff | bigrej | smallrej
+
+    def _incremented(self, b, c, big, small, offset, wrap):
+        (diff, bigrows, smallrows, positions) = self._compare(b, c, big, small)
+        # bighas[i, j]: some big row has value j of compCat (one count per
+        # instance and value, rather than an (instances, rows, values) array)
+        n = max(self.shape)
+        cells = np.arange(b.size)[:, None] * n + positions
+        bighas = np.bincount(cells[bigrows], minlength=b.size * n).reshape(-1, n) > 0
+        smallhas = np.bincount(cells[smallrows], minlength=b.size * n).reshape(-1, n) > 0
+
+        # ok[i, j, l]: big value j and small value l are offset apart (mod
+        # wrap, where there is one)
+        catvals = self.numeric[b, c]
+        gap = catvals[:, :, None] - catvals[:, None, :] - offset[:, None, None]
+        w = wrap[:, None, None]
+        ok = np.where(w > 0, np.mod(gap, np.where(w > 0, w, 1)) == 0, gap == 0)
+        badbig = bighas & ~(ok & smallhas[:, None, :]).any(axis=2)
+        badsmall = smallhas & ~(ok & bighas[:, :, None]).any(axis=1)
+
+        m = np.arange(b.size)[:, None]
+        return diff | (bigrows & badbig[m, positions]) | (smallrows & badsmall[m, positions])
+
+    def _clean_up(self):
+        """ rule.clean_up for the whole batch: is_only_remaining_pair, then
+            mark_confirmed. Returns whether it changed anything
+
+        """
+        # together[b, u, w]: some possible row has both u and w. Where that
+        # leaves u a single w in another category, is_same(u, w) rejects the
+        # rows with w but not u
+        together = self.pair_counts() > 0
+        single = np.zeros_like(together)
+        for c in range(self.k):
+            block = slice(self.starts[c], self.starts[c] + self.shape[c])
+            single[:, :, block] = together[:, :, block].sum(axis=2)[:, :, None] == 1
+            single[:, block, block] = False
+        single &= together
+        # rows holding some w that is single for a u the row doesn't hold
+        bad = _bdot(single.transpose(0, 2, 1), self._fnotmasks) > 0
+        bad = (bad & self.masks[None, :, :]).any(axis=1)
+        b = np.arange(self.B)
+        rejected = self._flip('possible', b, bad & self.possible)
+
+        # a value with just one unsure row left confirms that row
+        unsure = self.possible & ~self.confirmed
+        counts = unsure.astype(np.float32).dot(self._fmasks.T)
+        lone = (counts == 1).astype(np.float32).dot(self._fmasks) > 0
+        return self._flip('confirmed', b, lone & unsure) or rejected
+
+    # solving
+    def sweep(self):
+        """ run every rule and clean up once; returns whether anything
+            changed
+
+        """
+        changed = False
+        for kind in KERNELS:
+            ops = self._ops[kind]
+            if ops.shape[1]:
+                changed |= self._reject(ops[0], getattr(self, '_' + kind)(*ops))
+        return self._clean_up() or changed
+
+    def assume(self, b, u, w):
+        """ values u and w go together in puzzle b: reject the rows holding
+            just one of them (as is_same would)
+
+        """
+        self._reject(np.array([b]), (self.masks[u] ^ self.masks[w])[None])
+
+    def undo(self, mark=0):
+        """ put back every flip on the trail past its first mark entries """
+        while len(self.trail) > mark:
+            (name, flat) = self.trail.pop()
+            getattr(self, name).flat[flat] = name == 'possible'
+
+    def rejects(self, b, i):
+        """ (rows,) what rule i of puzzle b would reject now, without
+            rejecting it
+
+        """
+        rows = np.zeros(self.R, dtype=bool)
+        for kind in KERNELS:
+            ops = self._ops[kind]
+            which = (ops[0] == b) & (self._rulepos[kind] == i)
+            if which.any():
+                rows |= getattr(self, '_' + kind)(*ops[:, which]).any(axis=0)
+        return rows & self.possible[b]
+
+    def touched(self, b):
+        """ (rules, rows): for each rule of puzzle b, the rows with any of
+            its values; nothing outside them changes what it would reject
+
+        """
+        touched = np.zeros((len(self.puzzles[b][1]), self.R), dtype=bool)
+        for kind in KERNELS:
+            ops = self._ops[kind]
+            which = ops[0] == b
+            for (i, values) in zip(self._rulepos[kind][which], ops[VALUE_OPS[kind], which].T):
+                touched[i] |= self.masks[values].any(axis=0)
+        return touched
+
+    def cleans_up(self):
+        """ (rejected, confirmed), each (B, rows): what clean_up would do
+            now, without doing it
+
+        """
+        (before, self.trail) = (self.trail, [])
+        try:
+            self._clean_up()
+            step = (np.zeros_like(self.possible), np.zeros_like(self.confirmed))
+            for (name, flat) in self.trail:
+                step[name == 'confirmed'].flat[flat] = True
+            self.undo()
+        finally:
+            self.trail = before
+        return step
+
+    def propagate(self, maxsweeps=None):
+        """ sweep until nothing changes (or maxsweeps); returns the number of
+            sweeps made
+
+        """
+        nsweeps = 0
+        while maxsweeps is None or nsweeps < maxsweeps:
+            nsweeps += 1
+            if not self.sweep():
+                break
+        return nsweeps
+
+    def solved(self):
+        """ (B,) no unsure rows left (LogicPuzzle.solved) """
+        return ~(self.possible & ~self.confirmed).any(axis=1)
+
+    def contradictions(self):
+        """ (B,) some value has no possible rows left """
+        counts = self.possible.astype(np.float32).dot(self._fmasks.T)
+        return (counts == 0).any(axis=1)
+
+    def pair_counts(self):
+        """ (B, N, N) number of possible rows holding both value u and w """
+        rows = self._fmasks[None, :, :] * self.possible[:, None, :]
+        return _bdot(rows, self._fmasks.T)
+
+    def pair_grid(self, ci, cj):
+        """ (B, n_ci, n_cj) grid of which values of categories ci and cj
+            could still belong to the same entity
+
+        """
+        (bi, bj) = [
+            slice(self.starts[c], self.starts[c] + self.shape[c]) for c in (ci, cj)
+        ]
+        return self.pair_counts()[:, bi, bj] > 0
+
+    def solve(self, maxsweeps=None):
+        """ propagate, then one entry per puzzle: its solution as one tuple of
+            values per entity in category order (like ExactCover), or None if
+            it isn't solved (or is contradictory)
+
+        """
+        self.propagate(maxsweeps)
+        solved = self.solved() & ~self.contradictions()
+        return [
+            self.solution(b) if solved[b] else None
+            for b in range(self.B)
+        ]
+
+    def solution(self, b):
+        (categories, rules) = self.puzzles[b]
+        return [
+            tuple(cat.values[j] for (cat, j) in zip(categories, self.codes[r]))
+            for r in np.flatnonzero(self.confirmed[b] & self.possible[b])
+        ]
+
+
+def supported(r):
+    """ whether TensorEngine can run rule r: it has a kernel, and its filters
+        are plain values (or know their value, like template.MaskFilter)
+
+    """
+    def plain(v):
+        if isinstance(v, (list, tuple)):
+            return all(plain(x) for x in v)
+        return not callable(v) or hasattr(v, 'value')
+    return r.f.__name__ in RULES and all(plain(v) for v in r.params.values())
+
+
+def _value(v):
+    """ filters that know their value (template.MaskFilter) are as good as
+        the value
+
+    """
+    if isinstance(v, (list, tuple)):
+        return [_value(x) for x in v]
+    return v.value if callable(v) else v
+
+
+def _bdot(a, m):
+    """ a[b].dot(m) for every b, as one matrix product """
+    (B, i, j) = a.shape
+    return a.reshape(B * i, j).astype(np.float32).dot(m).reshape(B, i, -1)
+
+
+def _number(v):
+    """ comparable number for a category value (nan if there isn't one) """
+    if hasattr(v, 'ordinal'):
+        return v.ordinal
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
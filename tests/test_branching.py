@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_branching.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test parallel branch exploration on a puzzle propagation can't finish
+
+Usage:
+    <usage>
+
+"""
+
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+
+import branching
+import categories
+import encoded
+import puzzle
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestBranchExplorer(unittest.TestCase):
+    def setUp(self):
+        self.c = categories.CategoriesFromYaml(
+            FMT.format(num=2, ftype='categories', ext='yaml')
+        )
+        self.r = rulelist.RulesFromFile(
+            FMT.format(num=2, ftype='rules', ext='txt'), self.c
+        )
+
+    def test_propagation_stalls(self):
+        p = puzzle.LogicPuzzle(self.c, self.r, maxsolveattempts=None)
+        self.assertFalse(p.propagate())
+        self.assertTrue(p.consistent())
+
+    def test_solve(self):
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        self.assertTrue(branching.BranchExplorer(p, processes=2).solve())
+        a = p.solution.reset_index(drop=True)[self.c.names]
+        b = pd.read_csv(FMT.format(num=2, ftype='solution', ext='csv'))
+        self.assertEqual(a.values.tolist(), b[self.c.names].values.tolist())
+
+    def test_branch_state(self):
+        # a branch on the engine's row state lands where a decoded table does
+        p = puzzle.LogicPuzzle(self.c, self.r, maxsolveattempts=None)
+        p.propagate()
+        explorer = branching.BranchExplorer(p)
+        (col, val, othercol, partners) = explorer.choose_split()
+        (index, codes, status) = encoded.encode(p.df, self.c)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'table.bin')
+            encoded.MappedTable.create(path, index, codes, status)
+            results = {}
+            for engine in (p.prober(), None):
+                branching._init_worker(self.c, self.r, engine)
+                results[engine is None] = [
+                    branching.explore_branch((path, col, val, othercol, other))
+                    for other in partners
+                ]
+        finally:
+            shutil.rmtree(tmpdir)
+
+        self.assertIsNotNone(p.prober())
+        self.assertIn(None, results[False])
+        for (a, b) in zip(results[False], results[True]):
+            if a is None or b is None:
+                self.assertEqual(a, b)
+            else:
+                self.assertEqual(a[0].tolist(), b[0].tolist())
+                self.assertEqual(a[1].tolist(), b[1].tolist())
+
+    def test_contradiction(self):
+        r = self.r + rulelist.RulesFromText(["anna wasn't fish."], self.c)
+        p = puzzle.LogicPuzzle(self.c, r)
+        with self.assertRaises(branching.BranchingError):
+            branching.BranchExplorer(p, processes=2).solve()
+
+
+if __name__ == '__main__':
+    unittest.main()
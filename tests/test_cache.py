@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_cache.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test canonical puzzle forms and the solution cache
+
+Usage:
+    <usage>
+
+"""
+
+import collections
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+
+import yaml
+
+import cache
+import canonical
+import categories
+import puzzle
+import rule
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self):
+        with open(FMT.format(num=1, ftype='categories', ext='yaml'), 'rb') as f:
+            cats = yaml.load(f)
+        with open(FMT.format(num=1, ftype='rules', ext='txt'), 'rb') as f:
+            self.lines = [line.strip() for line in f]
+        self.c = categories.CategoriesFromDict(cats)
+        self.r = rulelist.RulesFromText(self.lines, self.c)
+
+        # same puzzle, everything shuffled, one rule reworded and one repeated
+        rand = random.Random(0)
+        for d in cats.values():
+            rand.shuffle(d['values'])
+        self.c2 = categories.CategoriesFromDict(
+            collections.OrderedDict(reversed(cats.items()))
+        )
+        lines = list(self.lines)
+        lines[3] = '13. The boy who wore number 28 was Hugh.'
+        lines.append(lines[0])
+        rand.shuffle(lines)
+        self.r2 = rulelist.RulesFromText(lines, self.c2)
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'solutions.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_canonical(self):
+        self.assertNotEqual(self.c.names, self.c2.names)
+        self.assertEqual(
+            canonical.digest(self.c, self.r), canonical.digest(self.c2, self.r2)
+        )
+        self.assertNotEqual(
+            canonical.digest(self.c, self.r), canonical.digest(self.c, self.r[1:])
+        )
+
+    def test_canonical_edge_cases(self):
+        (singular, plural) = [
+            rule.Rule(rule.is_ordered, compCat=compcat, bigfilt='hugh', smallfilt='benny')
+            for compcat in ['game', 'games']
+        ]
+        self.assertEqual(
+            canonical.digest(self.c, [singular]), canonical.digest(self.c, [plural])
+        )
+        self.assertEqual(
+            canonical.value_key(float('nan')), canonical.value_key(float('nan'))
+        )
+        self.assertNotEqual(
+            canonical.value_key(float('nan')), canonical.value_key(float('inf'))
+        )
+
+    def test_shared_file(self):
+        # several connections to one file (as from the service's worker
+        # processes) never hand out the same "last used" tick twice
+        def work(i):
+            c = cache.SolutionCache(self.path)
+            for j in range(20):
+                cats = categories.CategoriesFromDict({
+                    'a': {'values': ['x', 'y']},
+                    'b{}_{}'.format(i, j): {'values': [1, 2], 'type': 'int'},
+                })
+                c.put(cats, [], [('x', 1), ('y', 2)])
+            c.close()
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        c = cache.SolutionCache(self.path)
+        (n, used) = c._conn.execute(
+            'SELECT COUNT(*), COUNT(DISTINCT used) FROM solutions'
+        ).fetchone()
+        self.assertEqual((n, used), (80, 80))
+
+    def test_solve(self):
+        c = cache.SolutionCache(self.path)
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        self.assertTrue(c.solve(p).solved)
+        self.assertEqual(c.stats()['misses'], 1)
+
+        # a fresh connection to the same file, for the shuffled puzzle
+        c = cache.SolutionCache(self.path)
+        q = puzzle.LogicPuzzle(self.c2, self.r2)
+        self.assertTrue(c.solve(q).solved)
+        self.assertEqual(c.stats()['hits'], 1)
+        self.assertEqual(q._solve_attempts, 0)
+        soln = q.solution.set_index('players').sort_index()
+        expected = p.solution.set_index('players').sort_index()
+        self.assertTrue(soln[expected.columns].equals(expected))
+
+    def test_lru(self):
+        c = cache.SolutionCache(self.path, maxentries=2)
+        rows = [('x', 1), ('y', 2)]
+        puzzles = []
+        for i in range(3):
+            cats = categories.CategoriesFromDict({
+                'a': {'values': ['x', 'y']},
+                'b{}'.format(i): {'values': [1, 2], 'type': 'int'},
+            })
+            puzzles.append(cats)
+            c.put(cats, [], rows)
+            if i == 1:
+                # touch the first one so that the second is evicted instead
+                self.assertEqual(c.get(puzzles[0], []), rows)
+
+        self.assertEqual(c.get(puzzles[0], []), rows)
+        self.assertIsNone(c.get(puzzles[1], []))
+        self.assertEqual(c.get(puzzles[2], []), rows)
+        stats = c.stats()
+        self.assertEqual(
+            (stats['entries'], stats['evictions'], stats['hits'], stats['misses']),
+            (2, 1, 3, 1)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_common.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    tests for common: months, and what importing the cli (and a tiny solve)
+    costs
+
+Usage:
+    <usage>
+
+"""
+
+import collections
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import categories
+import common
+import puzzle
+import rulelist
+
+
+# ----------------------------- #
+#   Module Constants            #
+# ----------------------------- #
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# seconds; importing puzzlesolver takes ~.02s without pandas, ~.6s with
+IMPORT_BUDGET = .2
+
+# seconds, for importing puzzle and solving a 3x3 puzzle in a fresh process;
+# nearly all of it is importing pandas (~.6-.8s), which a solve can't do
+# without. Our own imports on top of pandas take ~.02s, the solve ~.1s
+SOLVE_BUDGET = 2.
+
+# modules a plain solve has no use for
+OPTIONAL = [
+    'multiprocessing', 'portfolio', 'exactcover', 'tensor', 'hints', 'fused',
+    'encoded', 'provenance',
+]
+
+MONTH_RULES = [
+    'alice was born 2 more months than bob.',
+    'carol was born in april.',
+    'alice had the cat.',
+    "dave didn't have the fish.",
+    "the dog's owner was born in january.",
+    "carol didn't have the bird.",
+]
+
+COLD_START = """
+import json, sys, time
+t = time.time()
+import puzzlesolver
+print json.dumps({
+    'elapsed': time.time() - t,
+    'loaded': [m for m in ('pandas', 'yaml') if m in sys.modules],
+})
+"""
+
+COLD_SOLVE = """
+import json, sys, time
+t = time.time()
+import pandas, yaml
+deps = time.time() - t
+t = time.time()
+import categories, puzzle, rulelist
+imports = time.time() - t
+t = time.time()
+c = categories.CategoriesFromDict({
+    'people': {'values': ['alice', 'bob', 'carol']},
+    'pets': {'values': ['cat', 'dog', 'fish']},
+    'ages': {'values': [1, 2, 3], 'type': int},
+})
+r = rulelist.RulesFromText([
+    'alice had the cat.',
+    'bob was 2.',
+    "carol didn't have the fish.",
+    'the dog owner was 1.',
+], c)
+p = puzzle.LogicPuzzle(c, r)
+p.solve()
+print json.dumps({
+    'deps': deps,
+    'imports': imports,
+    'solve': time.time() - t,
+    'solved': p.solved(),
+    'loaded': [m for m in %r if m in sys.modules],
+})
+""" % OPTIONAL
+
+
+class TestMonths(unittest.TestCase):
+    def test_monthify(self):
+        for x in ['se', 'Sept', 9, '9', 'SEPTEMBER']:
+            self.assertEqual(common.monthify(x), common.to_month(9))
+        self.assertTrue(common.is_month(common.monthify('jan')))
+        self.assertFalse(common.is_month('jan'))
+        with self.assertRaises(common.MonthifyError):
+            common.monthify('smarch')
+
+    def test_ordinals(self):
+        self.assertEqual(common.month_ordinal('feb', year=1970), 1)
+        self.assertEqual(common.month_ordinal('dec', year=2026), 683)
+        for x in ['jan', 'june', 12]:
+            o = common.month_ordinal(x)
+            self.assertEqual(common.from_ordinal(o), common.monthify(x))
+            self.assertEqual(common.from_ordinal(o).ordinal, o)
+
+    def test_month_puzzle(self):
+        c = month_categories(['january', 'february', 'march', 'april'])
+        self.assertEqual(c.months, {'months'})
+        self.assertEqual(c[1].dtype, 'int64')
+        r = rulelist.RulesFromText(MONTH_RULES, c)
+        self.assertEqual(r[1].params['filt2'], common.month_ordinal('april'))
+
+        p = puzzle.LogicPuzzle(c, r)
+        partial = p.solve()
+        self.assertTrue(p.solved())
+        # results come back as months, not ordinals
+        soln = p.solution
+        soln = dict(zip(soln.people.tolist(), soln.months.tolist()))
+        self.assertEqual(soln['alice'], common.monthify('march'))
+        self.assertEqual(soln['bob'], common.monthify('january'))
+        self.assertEqual(partial.domains['alice']['months'], [common.monthify('march')])
+        self.assertIn(
+            (('people', 'bob'), ('months', common.monthify('january'))),
+            partial.confirmed
+        )
+        self.assertEqual(
+            sorted(p.solution_rows())[0][1], common.month_ordinal('march')
+        )
+
+    def test_wrap(self):
+        c = month_categories(['november', 'december', 'january', 'february'])
+        for wrapmonths in (False, True):
+            r = rulelist.RulesFromText(MONTH_RULES[:1], c, wrapmonths=wrapmonths)
+            p = puzzle.LogicPuzzle(c, r)
+            p.propagate()
+            poss = c.display(p.poss)
+            alice = set(poss[poss.people == 'alice'].months.map(str))
+            if wrapmonths:
+                self.assertEqual(r[0].params['wrap'], 12)
+                # two months after november and december
+                self.assertEqual(len(alice), 2)
+                self.assertTrue(all(m.endswith(('-01', '-02')) for m in alice))
+            else:
+                # same year: no two of these months are two months apart
+                self.assertNotIn('wrap', r[0].params)
+                self.assertEqual(alice, set())
+
+
+def month_categories(months):
+    return categories.CategoriesFromDict(collections.OrderedDict([
+        ('people', {'values': ['alice', 'bob', 'carol', 'dave']}),
+        ('months', {'values': months, 'type': common.MONTH}),
+        ('pets', {'values': ['cat', 'dog', 'fish', 'bird']}),
+    ]))
+
+
+class TestColdStart(unittest.TestCase):
+    def test_import_budget(self):
+        out = subprocess.check_output(
+            [sys.executable, '-W', 'ignore', '-c', COLD_START], cwd=ROOT
+        )
+        res = json.loads(out)
+        self.assertEqual(res['loaded'], [])
+        self.assertLess(res['elapsed'], IMPORT_BUDGET)
+
+    def test_solve_budget(self):
+        out = subprocess.check_output(
+            [sys.executable, '-W', 'ignore', '-c', COLD_SOLVE], cwd=ROOT
+        )
+        res = json.loads(out)
+        self.assertTrue(res['solved'])
+        self.assertEqual(res['loaded'], [])
+        # past pandas itself, the solve is what takes the time
+        self.assertLess(res['imports'], res['solve'])
+        self.assertLess(res['deps'] + res['imports'] + res['solve'], SOLVE_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_encoded.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the integer encoded possibility table
+
+Usage:
+    <usage>
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import categories
+import common
+import encoded
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestEncoded(unittest.TestCase):
+    def setUp(self):
+        self.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        self.df = self.c.possibilities()
+        self.df.loc[5:10, common.STATUS] = common.REJECTED
+        self.df.loc[12, common.STATUS] = common.CONFIRMED
+        self.df = self.df.iloc[3:]
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_roundtrip(self):
+        (index, codes, status) = encoded.encode(self.df, self.c)
+        self.assertEqual(codes.shape, (self.df.shape[0], 4))
+        self.assertEqual(list(index[:2]), [3, 4])
+        df = encoded.decode(index, codes, status, self.c)
+        self.assertTrue(df.equals(self.df))
+
+    def test_row_state(self):
+        (possible, confirmed) = encoded.row_state(self.df, self.c)
+        self.assertEqual(self.c.nrows, 6 ** 4)
+        self.assertEqual(possible.shape, (self.c.nrows,))
+        # rows 0-2 were dropped and 5-10 rejected
+        self.assertEqual(
+            (~possible).nonzero()[0].tolist(), [0, 1, 2, 5, 6, 7, 8, 9, 10]
+        )
+        self.assertEqual(confirmed.nonzero()[0].tolist(), [12])
+
+    def test_mapped(self):
+        path = os.path.join(self.tmpdir, 'table.bin')
+        encoded.MappedTable.create(path, *encoded.encode(self.df, self.c))
+        t = encoded.MappedTable(path)
+        self.assertEqual(t.header['nrows'], self.df.shape[0])
+        self.assertTrue(t.decode(self.c).equals(self.df))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_exactcover.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the exact cover solution counter
+
+Usage:
+    <usage>
+
+"""
+
+import os
+import pandas as pd
+import unittest
+
+import categories
+import exactcover
+import rule
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestExactCover(unittest.TestCase):
+    def setUp(self):
+        self.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        self.r = rulelist.RulesFromFile(
+            FMT.format(num=1, ftype='rules', ext='txt'), self.c
+        )
+
+    def test_unique(self):
+        self.assertEqual(exactcover.count_solutions(self.c, self.r), 1)
+        self.assertTrue(exactcover.is_unique(self.c, self.r))
+
+    def test_solution(self):
+        (soln,) = exactcover.ExactCover(self.c, self.r).solutions()
+        b = pd.read_csv(FMT.format(num=1, ftype='solution', ext='csv'))
+        b = b[self.c.names]
+        self.assertEqual(soln, [tuple(row) for row in b.values.tolist()])
+
+    def test_ambiguous(self):
+        r = self.r[1:]
+        self.assertEqual(exactcover.count_solutions(self.c, r, limit=2), 2)
+        self.assertFalse(exactcover.is_unique(self.c, r))
+
+    def test_limit_restores_state(self):
+        ec = exactcover.ExactCover(self.c, self.r[1:])
+        total = exactcover.ExactCover(self.c, self.r[1:]).count()
+        self.assertEqual(ec.count(limit=1), 1)
+        self.assertEqual(ec.count(limit=2), 2)
+        self.assertEqual(ec.count(), total)
+
+        # a caller walking away from the generator is no different
+        solns = ec.solutions()
+        next(solns)
+        solns.close()
+        self.assertEqual(ec.count(), total)
+
+    def test_contradiction(self):
+        r = self.r + [rule.Rule(rule.is_diff, filt1='hugh', filt2=28)]
+        self.assertEqual(exactcover.count_solutions(self.c, r), 0)
+
+    def test_unknown_value(self):
+        r = [rule.Rule(rule.is_same, filt1='hugh', filt2='nobody')]
+        with self.assertRaises(exactcover.ExactCoverError):
+            exactcover.ExactCover(self.c, r)
+
+
+if __name__ == '__main__':
+    unittest.main()
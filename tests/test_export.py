@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_export.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the arrow / parquet export (skipped without pyarrow) and the
+    deltas behind it (which don't need pyarrow)
+
+    No pyarrow release installs next to the numpy 1.10 in
+    environment.yaml. The round trips run against pyarrow 0.16.0 (the last
+    release with python 2.7 wheels) and numpy 1.16.6, installed into a
+    separate directory ahead of the lps env; pandas 0.17.1 still comes from
+    the env
+
+Usage:
+    pip install --target /tmp/lps-arrow pyarrow==0.16.0 numpy==1.16.6
+    PYTHONPATH=/tmp/lps-arrow:. python -m pytest tests/test_export.py
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import categories
+import common
+import encoded
+import export
+import provenance
+import puzzle
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+@unittest.skipIf(export.pa is None, "pyarrow isn't installed")
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        r = rulelist.RulesFromFile(FMT.format(num=1, ftype='rules', ext='txt'), c)
+        self.p = puzzle.LogicPuzzle(c, r, keepprovenance=True)
+        self.p.solve()
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_roundtrip(self):
+        for fmt in ('arrow', 'parquet'):
+            path = os.path.join(self.tmp, fmt)
+            export.write(self.p, path, fmt=fmt)
+            (state, deltas) = export.read(path, fmt=fmt)
+
+            self.assertTrue(export.stats(state)['solved'])
+            self.assertEqual(export.stats(deltas)['rows'], self.p.df.shape[0])
+
+            labels = column(state, 'label')
+            self.assertEqual(labels, self.p.df.index.tolist())
+            for name in self.p.categories.names + [common.STATUS]:
+                self.assertEqual(
+                    [str(v) for v in column(state, name)],
+                    [str(v) for v in self.p.df[name].tolist()]
+                )
+            self.assertEqual(
+                column(state, 'rule'), self.p.provenance.rule[labels].tolist()
+            )
+
+            # replaying the deltas lands on the current table
+            status = np.zeros(self.p.full_df.shape[0], dtype=np.int8)
+            self.assertEqual(column(deltas, 'iteration'), sorted(column(deltas, 'iteration')))
+            for (label, s) in zip(column(deltas, 'label'), column(deltas, common.STATUS)):
+                status[label] = common.STATUSES.index(s)
+            self.assertEqual(
+                status.tolist(),
+                encoded.encode_status(self.p.full_df[common.STATUS]).tolist()
+            )
+
+    def test_dictionary_columns(self):
+        export.write(self.p, self.tmp)
+        (state, deltas) = export.read(self.tmp)
+        for name in self.p.categories.names + [common.STATUS]:
+            col = state.schema.field_by_name(name)
+            self.assertEqual(str(col.type).split('<')[0], 'dictionary')
+
+
+class TestDeltas(unittest.TestCase):
+    def setUp(self):
+        self.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        self.r = rulelist.RulesFromFile(
+            FMT.format(num=1, ftype='rules', ext='txt'), self.c
+        )
+
+    def test_deltas(self):
+        # no history needed
+        p = puzzle.LogicPuzzle(self.c, self.r, keepprovenance=True, keephistory=False)
+        p.solve()
+        (iterations, labels, statuses, rules) = export.deltas(p)
+
+        # replaying them lands on the current table
+        status = np.zeros(p.full_df.shape[0], dtype=np.int8)
+        status[labels] = statuses
+        self.assertEqual(
+            status.tolist(), encoded.encode_status(p.full_df[common.STATUS]).tolist()
+        )
+        self.assertEqual(len(set(labels.tolist())), labels.size)
+
+        self.assertTrue((np.diff(iterations) >= 0).all())
+        self.assertEqual(iterations.max(), p._solve_attempts)
+        confirmed = statuses == common.STATUSES.index(common.CONFIRMED)
+        self.assertEqual(confirmed.sum(), len(self.c[0]))
+        self.assertTrue((rules[confirmed] == provenance.NOT_REJECTED).all())
+        self.assertTrue((iterations[confirmed] >= 1).all())
+        self.assertEqual(
+            rules[~confirmed].tolist(), p.provenance.rule[labels[~confirmed]].tolist()
+        )
+
+    def test_needs_provenance(self):
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        self.assertRaises(export.ExportError, export.deltas, p)
+
+
+def column(table, name):
+    return table.column(name).to_pylist()
+
+
+if __name__ == '__main__':
+    unittest.main()
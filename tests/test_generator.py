@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_generator.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the random puzzle generator
+
+Usage:
+    <usage>
+
+"""
+
+import os
+import unittest
+
+import categories
+import generator
+import puzzle
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FCATS = os.path.join(CONFIG, '002.categories.yaml')
+
+
+class TestPuzzleGenerator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.c = categories.CategoriesFromYaml(FCATS)
+        cls.g = generator.PuzzleGenerator(cls.c, seed=1337)
+        cls.p = cls.g.generate()
+
+    def test_lines_parse_to_rules(self):
+        r = rulelist.RulesFromText(self.p.lines, self.c)
+        self.assertEqual(
+            [(x.f, x.params) for x in r],
+            [(x.f, x.params) for x in self.p.rules]
+        )
+
+    def test_solution(self):
+        r = rulelist.RulesFromText(self.p.lines, self.c)
+        lp = puzzle.LogicPuzzle(self.c, r)
+        lp.solve()
+        self.assertTrue(lp.solution.equals(self.p.solution))
+
+    def test_minimal(self):
+        for i in range(len(self.p.rules)):
+            rules = self.p.rules[:i] + self.p.rules[i + 1:]
+            lp = puzzle.LogicPuzzle(self.c, rules, maxsolveattempts=None)
+            self.assertFalse(lp.propagate())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_portfolio.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test portfolio solving
+
+Usage:
+    <usage>
+
+"""
+
+import os
+import unittest
+
+import categories
+import portfolio
+import puzzle
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        self.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        self.r = rulelist.RulesFromFile(
+            FMT.format(num=1, ftype='rules', ext='txt'), self.c
+        )
+
+    def test_strategies_agree(self):
+        rows = [
+            portfolio.run_strategy(self.c, self.r, s)
+            for s in portfolio.STRATEGIES[:3]
+        ]
+        self.assertEqual(rows[0], rows[1])
+        self.assertEqual(rows[0], rows[2])
+
+    def test_solve_portfolio(self):
+        q = puzzle.LogicPuzzle(self.c, self.r)
+        q.solve()
+
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        strategy = p.solve_portfolio(processes=2)
+        self.assertIn(strategy, portfolio.STRATEGIES[:2])
+        self.assertTrue(p.solved())
+        self.assertTrue(p.solution.equals(q.solution))
+
+    def test_all_fail(self):
+        with self.assertRaises(portfolio.PortfolioError):
+            portfolio.solve_portfolio(self.c, self.r[1:], processes=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
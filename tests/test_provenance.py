@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_provenance.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the rejection provenance log
+
+Usage:
+    <usage>
+
+"""
+
+import os
+import unittest
+
+import categories
+import common
+import provenance
+import puzzle
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestProvenance(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        cls.r = rulelist.RulesFromFile(
+            FMT.format(num=1, ftype='rules', ext='txt'), cls.c
+        )
+        cls.p = puzzle.LogicPuzzle(cls.c, cls.r, keepprovenance=True)
+        cls.p.solve()
+
+    def test_every_rejection_logged(self):
+        log = self.p.provenance
+        full = self.p.full_df
+        rejected = full.index[full[common.STATUS] == common.REJECTED]
+        self.assertEqual(sum(log.counts().values()), len(rejected))
+        self.assertEqual(list((log.rule != provenance.NOT_REJECTED).nonzero()[0]), list(rejected))
+        self.assertEqual(log.nbytes(), 12 * full.shape[0])
+
+        for label in self.p.solution.index:
+            self.assertIsNone(self.p.why(label))
+
+    def test_queries(self):
+        log = self.p.provenance
+        counts = log.counts()
+        self.assertGreater(counts[provenance.CLEAN_UP], 0)
+        self.assertNotIn(provenance.EXTERNAL, counts)
+
+        ruleid = max((i for i in counts if i >= 0), key=counts.get)
+        label = log.rejected_by(ruleid)[0]
+        (r, iteration) = self.p.why(label)
+        self.assertIs(r, self.r[ruleid])
+        self.assertEqual(iteration, 1)
+
+        never = log.never_pruned(range(len(self.r)))
+        self.assertTrue(all(counts[i] == 0 for i in never))
+        self.assertEqual(len(never) + len([i for i in counts if i >= 0]), len(self.r))
+
+    def test_many_rules(self):
+        # rule ids past what an int16 holds (generated / service puzzles)
+        df = self.c.possibilities()
+        df.loc[:3, common.STATUS] = common.REJECTED
+        log = provenance.ProvenanceLog(df.shape[0])
+        log.record(40000, 1, df)
+        self.assertEqual(log.why(2), (40000, 1))
+        self.assertEqual(log.counts(), {40000: 4})
+
+    def test_off_by_default(self):
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        self.assertIsNone(p.provenance)
+        self.assertRaises(puzzle.LogicPuzzleError, p.why, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,9 +16,14 @@ Usage:
 
 import os
 import pandas as pd
+import shutil
+import tempfile
 import unittest
 
 import categories
+import common
+import provenance
+import rule
 import rulelist
 import puzzle
 
@@ -54,5 +59,282 @@ class TestLogicPuzzle(unittest.TestCase):
         self.assertEqual(a, b)
 
 
+class TestLogicPuzzleOptions(unittest.TestCase):
+    def setUp(self):
+        self.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        self.r = rulelist.RulesFromFile(
+            FMT.format(num=1, ftype='rules', ext='txt'), self.c
+        )
+
+    def test_compact(self):
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        p.solve()
+        q = puzzle.LogicPuzzle(self.c, self.r, compactthreshold=None)
+        q.solve()
+        self.assertLess(p.df.shape[0], q.df.shape[0])
+        self.assertTrue(p.solution.equals(q.solution))
+        self.assertTrue(p.full_df.equals(q.df))
+        self.assertFalse(common.is_possible(q.df.drop(p.df.index)).any())
+
+    def test_deadline(self):
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        partial = p.solve(timebudget=0)
+        self.assertTrue(partial.expired)
+        self.assertFalse(partial.solved)
+        self.assertEqual(partial.progress, 0)
+        self.assertEqual(len(partial.domains), 6)
+
+        partial = p.solve()
+        self.assertTrue(partial.solved)
+        self.assertFalse(partial.expired)
+        self.assertEqual(partial.progress, 1)
+        self.assertIn((('players', 'hugh'), ('numbers', 28)), partial.confirmed)
+        self.assertEqual(partial.domains['hugh']['games'], [12])
+
+    def test_confirmed_pairs(self):
+        # first base can only be hugh, but hugh could still play anywhere
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        df = p.df.copy()
+        df.loc[
+            (df['positions'] == 'first') & (df['players'] != 'hugh'), common.STATUS
+        ] = common.REJECTED
+        p.df = df
+        self.assertEqual(
+            [set(pair) for pair in p.confirmed_pairs()],
+            [{('positions', 'first'), ('players', 'hugh')}]
+        )
+
+    def test_checkpoint(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'checkpoint.bin')
+            # checkpointinterval=0 writes one before every rule, so the last
+            # one is from the middle of the final sweep
+            p = puzzle.LogicPuzzle(
+                self.c, self.r, checkpointpath=path, checkpointinterval=0
+            )
+            p.solve()
+            q = puzzle.LogicPuzzle.resume(path)
+            self.assertEqual(q._rulepos, len(self.r) - 1)
+            self.assertEqual(q._solve_attempts, p._solve_attempts)
+            self.assertFalse(q.solved())
+            q.solve()
+            self.assertTrue(q.solution.equals(p.solution))
+            self.assertEqual(q._solve_attempts, p._solve_attempts)
+            self.assertFalse(os.path.exists(path + '.tmp'))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_checkpoint_unpicklable(self):
+        path = os.path.join(tempfile.gettempdir(), 'never-written.bin')
+        lam = rule.Rule(
+            rule.is_diff, filt1=common.catval_filter('games', 11), filt2='third'
+        )
+        with self.assertRaises(puzzle.LogicPuzzleError):
+            puzzle.LogicPuzzle(self.c, list(self.r) + [lam], checkpointpath=path)
+
+        p = puzzle.LogicPuzzle(self.c, list(self.r)[:-1], checkpointpath=path)
+        with self.assertRaises(puzzle.LogicPuzzleError):
+            p.add_rule(lam)
+        self.assertEqual(len(p.rules), len(self.r) - 1)
+        self.assertFalse(os.path.exists(path))
+
+    def test_add_remove_rule(self):
+        rules = list(self.r)
+        full = puzzle.LogicPuzzle(self.c, rules, keephistory=False)
+        full.propagate()
+        partial = puzzle.LogicPuzzle(self.c, rules[:-2], keephistory=False)
+        partial.propagate()
+
+        p = puzzle.LogicPuzzle(
+            self.c, rules[:-2], keephistory=False, keepprovenance=True
+        )
+        p.propagate()
+        p.add_rule(rules[-2])
+        self.assertTrue(p.add_rule(rules[-1]))
+        self.assertTrue(p.solution.equals(full.solution))
+
+        # an added rule rolls back to the trail, and the later one is re-added
+        p.remove_rule(rules[-2])
+        self.assertEqual(p.rules, rules[:-2] + rules[-1:])
+        p.remove_rule(len(p.rules) - 1)
+        self.assertTrue(
+            p.full_df[common.STATUS].equals(partial.full_df[common.STATUS])
+        )
+
+        # an original rule means starting over
+        p.remove_rule(rules[0])
+        scratch = puzzle.LogicPuzzle(self.c, rules[1:-2], keephistory=False)
+        scratch.propagate()
+        self.assertTrue(
+            p.full_df[common.STATUS].equals(scratch.full_df[common.STATUS])
+        )
+        counts = p.provenance.counts()
+        self.assertFalse([i for i in counts if i >= len(p.rules)])
+        self.assertEqual(
+            sum(counts.values()), (~common.is_possible(p.full_df)).sum()
+        )
+
+    def test_probe(self):
+        c = categories.CategoriesFromYaml(
+            FMT.format(num=2, ftype='categories', ext='yaml')
+        )
+        r = rulelist.RulesFromFile(FMT.format(num=2, ftype='rules', ext='txt'), c)
+        p = puzzle.LogicPuzzle(c, r, maxsolveattempts=None)
+        self.assertFalse(p.propagate())
+        self.assertIsNotNone(p.prober())
+
+        # the pairings that propagating a whole trial puzzle says are
+        # impossible, and the rows rejecting them takes
+        candidates = p.probe_candidates()
+        failed = [pairing for pairing in candidates if p._probe_trial(pairing)]
+        self.assertIn(('owners', 'anna', 'ages', 8), failed)
+        expected = p.df
+        for (col, val, othercol, other) in failed:
+            expected = rule.is_diff(
+                common.catval_filter(col, val),
+                common.catval_filter(othercol, other),
+                expected
+            )
+        self.assertEqual(p.probe(budget=len(candidates)), len(failed))
+        self.assertEqual(
+            p.df.index[~common.is_possible(p.df)].tolist(),
+            expected.index[~common.is_possible(expected)].tolist()
+        )
+
+        # propagate keeps probing past the first batch
+        p = puzzle.LogicPuzzle(c, r, probebudget=1, maxsolveattempts=None)
+        self.assertTrue(p.propagate())
+
+        p = puzzle.LogicPuzzle(c, r, probebudget=5, keepprovenance=True)
+        self.assertTrue(p.solve().solved)
+        a = p.solution.reset_index(drop=True)[c.names]
+        b = pd.read_csv(FMT.format(num=2, ftype='solution', ext='csv'))
+        self.assertEqual(a.values.tolist(), b[c.names].values.tolist())
+        self.assertGreater(p.provenance.counts()[provenance.PROBE], 0)
+
+    def test_contradiction(self):
+        r = list(self.r) + list(
+            rulelist.RulesFromText(['Hugh wore number 32.'], self.c)
+        )
+        p = puzzle.LogicPuzzle(self.c, r)
+        with self.assertRaises(puzzle.LogicPuzzleContradiction) as cm:
+            p.solve()
+        e = cm.exception
+        self.assertEqual(p._solve_attempts, 1)
+        self.assertEqual(e.source, len(r) - 1)
+        self.assertIn(('players', 'hugh'), e.empty)
+        # rule 4 is "Hugh wore number 28."
+        self.assertEqual(e.core, [3, len(r) - 1])
+
+    def test_next_deduction(self):
+        p = puzzle.LogicPuzzle(self.c, self.r, keepprovenance=True)
+        d = p.next_deduction()
+        # "The person who played 11 games wore number 32."
+        self.assertEqual(d.source, 0)
+        self.assertEqual(p.next_deduction().rejected.tolist(), d.rejected.tolist())
+        self.assertTrue(common.is_possible(p.df).all())
+
+        while d is not None:
+            p.apply_deduction(d)
+            if d.rejected.size:
+                self.assertEqual(p.provenance.why(d.rejected[0])[0], d.source)
+            d = p.next_deduction()
+        self.assertTrue(p.solved())
+        b = pd.read_csv(FMT.format(num=1, ftype='solution', ext='csv'))
+        a = p.solution.reset_index(drop=True)[self.c.names]
+        self.assertEqual(a.values.tolist(), b[self.c.names].values.tolist())
+
+    def test_next_deduction_similarity_group(self):
+        # a similarity group before a (costlier) comparison: its rejections
+        # are its own, not the rule after it
+        group = rule.Rule(rule.similarity_group_updates, filtlist=['hugh', 32])
+        rules = [group, self.r[1]]
+        p = puzzle.LogicPuzzle(self.c, rules)
+        d = p.next_deduction()
+        self.assertIs(d.rule, group)
+        self.assertEqual(d.source, 0)
+        after = group(p.df)
+        self.assertEqual(
+            d.rejected.tolist(),
+            p.df.index[common.is_possible(p.df) & ~common.is_possible(after)].tolist()
+        )
+
+    def test_fused(self):
+        # the last rule as a hand written filter, which can't be fused
+        r = list(self.r)
+        r[-1] = rule.Rule(
+            rule.is_diff, filt1=common.catval_filter('games', 11), filt2='third'
+        )
+        p = puzzle.LogicPuzzle(self.c, r, fused=True, keepprovenance=True)
+        self.assertEqual(p.fused_sweep().positions, range(len(r) - 1))
+        self.assertTrue(p.solve().solved)
+        b = pd.read_csv(FMT.format(num=1, ftype='solution', ext='csv'))
+        a = p.solution.reset_index(drop=True)[self.c.names]
+        self.assertEqual(a.values.tolist(), b[self.c.names].values.tolist())
+        self.assertEqual(
+            set(p.provenance.counts()) - {provenance.CLEAN_UP}, set(range(len(r)))
+        )
+
+    def test_cached_views(self):
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        (poss, version) = (p.poss, p.version)
+        self.assertIs(p.poss, poss)
+        self.assertIs(p.solution, p.solution)
+        self.assertEqual(poss.shape[0], p.df.shape[0])
+        self.assertFalse(p.solved())
+
+        p.apply_rules()
+        self.assertGreater(p.version, version)
+        self.assertLess(p.poss.shape[0], poss.shape[0])
+        self.assertTrue(p.poss.equals(p.df[common.is_possible(p.df)]))
+
+        (poss, version) = (p.poss, p.version)
+        p.undo()
+        self.assertGreater(p.version, version)
+        self.assertGreater(p.poss.shape[0], poss.shape[0])
+
+        p.solve()
+        self.assertTrue(p.solved())
+        self.assertEqual(p.solution.shape[0], len(self.c[0]))
+
+    def test_iter_solve(self):
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        steps = p.iter_solve()
+        record = next(steps)
+        self.assertEqual((record.iteration, record.source), (1, 0))
+        self.assertLess(record.remaining, p.df.shape[0])
+        while not record.confirmed:
+            record = next(steps)
+        # stop early, and carry on where we left off
+        steps.close()
+        confirmed = set(record.confirmed)
+        self.assertTrue(confirmed <= set(p.confirmed_pairs()))
+        self.assertFalse(p.solved())
+        self.assertTrue(p.solve().solved)
+
+        q = puzzle.LogicPuzzle(self.c, self.r)
+        (found, last) = (set(), None)
+        for record in q.iter_solve():
+            found.update(record.confirmed)
+            self.assertEqual(record.remaining, q.poss.shape[0])
+            last = record
+        self.assertTrue(last.solved)
+        self.assertEqual(found, set(q.confirmed_pairs()))
+        self.assertTrue(q.solution.equals(p.solution))
+
+        partial = puzzle.LogicPuzzle(self.c, self.r).iter_solve(timebudget=0)
+        self.assertTrue(list(partial)[-1].expired)
+
+    def test_interleave(self):
+        ps = [puzzle.LogicPuzzle(self.c, self.r) for i in range(2)]
+        order = [i for (i, record) in puzzle.interleave(ps)]
+        self.assertEqual(order[:4], [0, 1, 0, 1])
+        self.assertEqual(order.count(0), order.count(1))
+        self.assertTrue(all(p.solved() for p in ps))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_rulelist.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    tests for rule lists; mostly the rule compiler
+
+Usage:
+    <usage>
+
+"""
+
+import os
+import unittest
+
+import categories
+import common
+import puzzle
+import rule
+import rulelist
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestCompiledRules(unittest.TestCase):
+    def setUp(self):
+        self.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        self.r = list(rulelist.RulesFromFile(
+            FMT.format(num=1, ftype='rules', ext='txt'), self.c
+        ))
+
+    def test_duplicates(self):
+        # the same lines again, one of them restated the other way around
+        again = rulelist.RulesFromText([
+            'Number 32 was the person who played 11 games.',
+            'Hugh wore number 28.',
+            "Theodore didn't play third base.",
+        ], self.c)
+        cr = rulelist.CompiledRules(self.r + list(again), self.c)
+        self.assertEqual(cr.removed['duplicate'], 3)
+        self.assertEqual(cr.sources[0], [0, 13])
+        self.assertIn('16 rules compiled to 13', cr.summary())
+
+    def test_lowering(self):
+        d = rule.Rule(rule.is_diff, filt1='hugh', filt2=3)
+        pair = rule.Rule(
+            rule.pair_is_pair, filt11='hugh', filt12=3, filt21='left', filt22=11
+        )
+        neither = rule.Rule(
+            rule.is_neither_nor, isfilt='benny', neitherfilt=3, norfilt='third'
+        )
+        cr = rulelist.CompiledRules([pair, d, neither], self.c)
+        self.assertEqual(
+            [r.f for r in cr],
+            [rule.is_either_or, rule.is_one_of, rule.is_either_or, rule.is_one_of,
+             rule.similarity_group_updates]
+        )
+        self.assertEqual(cr.removed['duplicate'], 1)
+        self.assertEqual(cr.removed['merged'], 2)
+        self.assertEqual(cr.sources[4], [2])
+
+    def test_implied(self):
+        rules = [
+            rule.Rule(rule.is_ordered, compCat='game', bigfilt='hugh', smallfilt=3, offset=1),
+            rule.Rule(rule.is_incremented, compCat='games', bigfilt='hugh', smallfilt=3, offset=2),
+            rule.Rule(rule.is_diff, filt1=3, filt2='hugh'),
+            rule.Rule(rule.similarity_group_updates, filtlist=['neil', 18]),
+            rule.Rule(rule.similarity_group_updates, filtlist=['neil', 18, 'left']),
+            rule.Rule(rule.is_diff, filt1='left', filt2='neil'),
+            rule.Rule(rule.is_diff, filt1='neil', filt2='hugh'),
+        ]
+        cr = rulelist.CompiledRules(rules, self.c)
+        self.assertEqual(cr.removed['implied'], 4)
+        self.assertEqual(cr.removed['trivial'], 1)
+        self.assertEqual(cr.sources, [[1], [4]])
+
+    def test_same_result(self):
+        again = list(rulelist.RulesFromText(['Hugh wore number 28.'], self.c))
+        cr = rulelist.CompiledRules(self.r + again, self.c)
+        (p1, p2) = [
+            puzzle.LogicPuzzle(self.c, r, maxsolveattempts=None)
+            for r in (self.r, cr)
+        ]
+        p1.propagate()
+        p2.propagate()
+        self.assertTrue(p2.solved())
+        self.assertTrue((
+            common.is_possible(p1.full_df) == common.is_possible(p2.full_df)
+        ).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
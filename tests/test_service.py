@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_service.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the solver service over a unix socket
+
+Usage:
+    <usage>
+
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import yaml
+
+import service
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestSolverService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.socketpath = os.path.join(cls.tmpdir, 'lps.sock')
+        cls.solverpool = service.SolverPool(workers=2)
+        cls.server = service.make_server(cls.solverpool, socketpath=cls.socketpath)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+        with open(FMT.format(num=1, ftype='categories', ext='yaml'), 'r') as f:
+            cats = yaml.load(f)
+        with open(FMT.format(num=1, ftype='rules', ext='txt'), 'r') as f:
+            rules = [line.strip() for line in f]
+        cls.request = {'categories': cats, 'rules': rules}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.solverpool.close()
+        shutil.rmtree(cls.tmpdir)
+
+    def ask(self, *requests):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.connect(self.socketpath)
+        f = s.makefile('rw')
+        responses = []
+        for request in requests:
+            f.write(json.dumps(request) + '\n')
+            f.flush()
+            responses.append(json.loads(f.readline()))
+        s.close()
+        return responses
+
+    def test_solve(self):
+        (resp,) = self.ask(self.request)
+        self.assertTrue(resp['solved'])
+        self.assertIn(
+            {'players': 'hugh', 'games': 12, 'numbers': 28, 'positions': 'first'},
+            resp['solution']
+        )
+
+    def test_batch_and_stats(self):
+        bad = dict(self.request, rules=['nonsense'])
+        (resp, stats) = self.ask(
+            {'puzzles': [self.request, bad, self.request]}, {'stats': True}
+        )
+        self.assertEqual([len(r['solution']) for r in resp['results'][::2]], [6, 6])
+        self.assertIn('error', resp['results'][1])
+        self.assertGreaterEqual(stats['requests'], 3)
+        self.assertGreaterEqual(stats['errors'], 1)
+        self.assertEqual(stats['inflight'], 0)
+        self.assertEqual(
+            sum(b['count'] for b in stats['latency']), stats['requests']
+        )
+
+    def test_bad_json(self):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.connect(self.socketpath)
+        f = s.makefile('rw')
+        f.write('{not json\n')
+        f.flush()
+        self.assertIn('error', json.loads(f.readline()))
+        s.close()
+
+    def test_not_an_object(self):
+        responses = self.ask([1, 2], 'x', {'puzzles': 3}, self.request)
+        for resp in responses[:3]:
+            self.assertTrue(resp['error'].startswith('bad request'))
+        self.assertTrue(responses[3]['solved'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_template.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the compiled puzzle template
+
+Usage:
+    <usage>
+
+"""
+
+import cPickle
+import os
+import threading
+import unittest
+
+import categories
+import common
+import puzzle
+import rulelist
+import template
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestPuzzleTemplate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.c = categories.CategoriesFromYaml(
+            FMT.format(num=1, ftype='categories', ext='yaml')
+        )
+        with open(FMT.format(num=1, ftype='rules', ext='txt'), 'rb') as f:
+            cls.lines = [line.strip() for line in f]
+        cls.t = template.PuzzleTemplate(cls.c)
+
+    def test_masks(self):
+        df = self.t.table
+        for v in ['hugh', 28, 'first']:
+            self.assertTrue(
+                (self.t.filter(v)(df) == common.val_filter(v)(df)).all()
+            )
+        self.assertRaises(template.TemplateError, self.t.filter, 'nobody')
+
+    def test_compiled_rules(self):
+        (r,) = self.t.parse(['hugh wore number 28.'])
+        (compiled,) = self.t.compile([r])
+        self.assertIs(self.t.compile([r])[0], compiled)
+        self.assertIsInstance(compiled.params['filt1'], template.MaskFilter)
+        self.assertEqual(cPickle.loads(cPickle.dumps(compiled)).params, r.params)
+
+    def test_compile_cache(self):
+        # re-parsing the same lines hits the cache instead of growing it
+        t = template.PuzzleTemplate(self.c)
+        p = t.puzzle(lines=self.lines)
+        ncompiled = len(t._compiled)
+        for i in range(5):
+            q = t.puzzle(lines=self.lines)
+        self.assertEqual(len(t._compiled), ncompiled)
+        self.assertTrue(all(a is b for (a, b) in zip(p.rules, q.rules)))
+
+        # and the template table can't be changed through a puzzle
+        full = q.full_df
+        full.loc[:, common.STATUS] = common.REJECTED
+        self.assertTrue((t.table[common.STATUS] == common.UNSURE).all())
+
+    def test_threads(self):
+        variants = [self.lines, self.lines[:-1], self.lines[1:], self.lines[:-3]]
+        expected = []
+        for lines in variants:
+            p = puzzle.LogicPuzzle(
+                self.c, rulelist.RulesFromText(lines, self.c), maxsolveattempts=None
+            )
+            p.propagate()
+            expected.append(p.full_df[common.STATUS])
+
+        results = [None] * len(variants)
+
+        def run(i):
+            p = self.t.puzzle(lines=variants[i], maxsolveattempts=None)
+            p.propagate()
+            results[i] = p.full_df[common.STATUS]
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(variants))]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+
+        for (a, b) in zip(results, expected):
+            self.assertTrue(a.equals(b))
+        self.assertTrue((self.t.table[common.STATUS] == common.UNSURE).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
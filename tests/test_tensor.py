@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module: test_tensor.py
+Author: zlamberty
+Created: 2026-10-19
+
+Description:
+    test the batched tensor engine
+
+Usage:
+    <usage>
+
+"""
+
+import collections
+import os
+import random
+import unittest
+
+import yaml
+
+import categories
+import common
+import puzzle
+import rulelist
+import tensor
+
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    'config'
+)
+FMT = os.path.join(CONFIG, '{num:0>3.0f}.{ftype:}.{ext:}')
+
+
+class TestTensorEngine(unittest.TestCase):
+    def setUp(self):
+        with open(FMT.format(num=1, ftype='categories', ext='yaml'), 'rb') as f:
+            cats = yaml.load(f)
+        with open(FMT.format(num=1, ftype='rules', ext='txt'), 'rb') as f:
+            lines = [line.strip() for line in f]
+        self.c = categories.CategoriesFromDict(cats)
+        self.r = list(rulelist.RulesFromText(lines, self.c))
+
+        # same puzzle with its values in another order
+        rand = random.Random(0)
+        for d in cats.values():
+            rand.shuffle(d['values'])
+        self.c2 = categories.CategoriesFromDict(
+            collections.OrderedDict((name, cats[name]) for name in self.c.names)
+        )
+        self.r2 = list(rulelist.RulesFromText(lines, self.c2))
+
+    def test_batch(self):
+        puzzles = [
+            (self.c, self.r), (self.c2, self.r2), (self.c, self.r[:-3]),
+            (self.c2, self.r2[2:]),
+        ]
+        solutions = tensor.TensorEngine(puzzles).solve()
+
+        p = puzzle.LogicPuzzle(self.c, self.r)
+        p.solve()
+        self.assertEqual(solutions[0], p.solution_rows())
+        self.assertEqual(sorted(solutions[1]), sorted(solutions[0]))
+        self.assertIsNone(solutions[2])
+        self.assertIsNone(solutions[3])
+
+    def test_same_fixed_point(self):
+        puzzles = [(self.c, self.r[:-3]), (self.c2, self.r2[2:])]
+        e = tensor.TensorEngine(puzzles)
+        e.propagate()
+        for (b, (c, r)) in enumerate(puzzles):
+            p = puzzle.LogicPuzzle(c, r, maxsolveattempts=None)
+            p.propagate()
+            full = p.full_df
+            self.assertTrue((common.is_possible(full).values == e.possible[b]).all())
+            confirmed = (full[common.STATUS] == common.CONFIRMED).values
+            self.assertTrue((confirmed == (e.confirmed[b] & e.possible[b])).all())
+
+        grid = e.pair_grid(0, 2)
+        self.assertEqual(grid.shape, (2, 6, 6))
+        # rule 4: hugh wore number 28
+        (i, j) = (self.c[0].tolist().index('hugh'), self.c[2].tolist().index(28))
+        self.assertEqual(grid[0, i].tolist(), [k == j for k in range(6)])
+
+    def test_subsets(self):
+        n = len(self.r)
+        active = [
+            [True] * n,
+            [i < n - 3 for i in range(n)],
+            [i != 3 for i in range(n)],
+        ]
+        e = tensor.TensorEngine([(self.c, self.r)]).subsets(active)
+        e.propagate()
+        separate = tensor.TensorEngine([
+            (self.c, [x for (x, a) in zip(self.r, row) if a]) for row in active
+        ])
+        separate.propagate()
+        self.assertTrue((e.possible == separate.possible).all())
+        self.assertTrue((e.confirmed == separate.confirmed).all())
+        self.assertEqual(e.solved().tolist(), [True, False, False])
+
+    def test_extend(self):
+        e = tensor.TensorEngine([(self.c, self.r[:4])])
+        e.propagate()
+        e.extend(self.r[4:])
+        self.assertEqual(len(e.puzzles[0][1]), len(self.r))
+        e.propagate()
+        whole = tensor.TensorEngine([(self.c, self.r)])
+        whole.propagate()
+        self.assertTrue((e.possible == whole.possible).all())
+        self.assertTrue((e.confirmed == whole.confirmed).all())
+        for kind in tensor.KERNELS:
+            self.assertEqual(e._rulepos[kind].tolist(), whole._rulepos[kind].tolist())
+
+    def test_trail(self):
+        e = tensor.TensorEngine([(self.c, self.r[:4])])
+        e.propagate()
+        before = (e.possible.copy(), e.confirmed.copy())
+        e.trail = []
+        e.assume(0, 0, e.starts[1])
+        e.propagate()
+        self.assertFalse((e.possible == before[0]).all())
+
+        # the trail holds exactly the entries that flipped
+        flipped = set()
+        for (name, flat) in e.trail:
+            flipped.update((name, i) for i in flat.tolist())
+        self.assertEqual(flipped, set(
+            [('possible', i) for i in (before[0] & ~e.possible).ravel().nonzero()[0]] +
+            [('confirmed', i) for i in (e.confirmed & ~before[1]).ravel().nonzero()[0]]
+        ))
+        e.undo()
+        self.assertEqual(e.trail, [])
+        self.assertTrue((e.possible == before[0]).all())
+        self.assertTrue((e.confirmed == before[1]).all())
+
+    def test_shapes(self):
+        c = categories.CategoriesFromYaml(
+            FMT.format(num=2, ftype='categories', ext='yaml')
+        )
+        with self.assertRaises(tensor.TensorError):
+            tensor.TensorEngine([(self.c, self.r), (c, [])])
+
+
+if __name__ == '__main__':
+    unittest.main()